@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the ML analysis hot path.
+Builds synthetic histories from the scenario generators in
+scanners/generate_test_data.py and measures per-analysis latency, memory
+and end-to-end /predict latency under concurrent load. Results are written
+as JSON so runs from different commits can be compared with --compare.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SERVICE_DIR)
+SERVICE_SCRIPT = os.path.join(SERVICE_DIR, 'standalone_ml_service.py')
+
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scanners'))
+
+import generate_test_data
+from standalone_ml_service import (
+    ANALYZER_BACKENDS, DEFAULT_BUCKET_MINUTES, create_analyzer, encode_body, np, select_analyses
+)
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_HTTP_SIZES = (100, 1000)
+DEFAULT_CONCURRENCY = (1, 8, 32)
+DEFAULT_HTTP_REQUESTS = 200
+DEFAULT_INTERVAL_MINUTES = 10
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+# Target number of timed points per measurement when --repeat is not given
+AUTO_REPEAT_BUDGET = 20000
+
+# Scenario name -> (generator, offset argument, offset reached by the last point).
+# Offsets match the point counts run_scenario uses, spread across the history.
+SCENARIOS = {
+    'normal_usage': (generate_test_data.simulate_normal_usage, None, 0),
+    'storage_growth': (generate_test_data.simulate_storage_growth, 'day_offset', 10),
+    'memory_leak': (generate_test_data.simulate_memory_leak, 'hour_offset', 8),
+    'cpu_spikes': (generate_test_data.simulate_cpu_spikes, None, 0),
+    'degrading_performance': (generate_test_data.simulate_degrading_performance, 'day_offset', 12),
+}
+
+# Records are matched between runs on these fields, then each metric is compared
+COMPARED_METRICS = {
+    'analysis': (('backend', 'scenario', 'points', 'analysis'), ('median_ms',)),
+    'end_to_end': (('backend', 'scenario', 'points'), ('median_ms', 'p99_ms')),
+    'memory': (('backend', 'scenario', 'points'), ('peak_kib',)),
+    'http': (('backend', 'points', 'concurrency'), ('p50_ms', 'p99_ms')),
+}
+
+
+def generate_history(scenario, points, interval_minutes=DEFAULT_INTERVAL_MINUTES, seed=0):
+    """Timestamped telemetry history of the given length for one scenario"""
+    generator, offset_argument, span = SCENARIOS[scenario]
+    # The generators draw from the module-level random state
+    random.seed(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    history = []
+    for index in range(points):
+        options = {}
+        if offset_argument:
+            options[offset_argument] = span * index / max(1, points - 1)
+        point = generator(**options)
+        point.pop('mac_address', None)
+        point['timestamp'] = (start + timedelta(minutes=interval_minutes * index)).isoformat()
+        history.append(point)
+    return history
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of timings in seconds"""
+    samples_ms = [sample * 1000 for sample in samples]
+    return {
+        'runs': len(samples_ms),
+        'median_ms': round(statistics.median(samples_ms), 4),
+        'mean_ms': round(statistics.fmean(samples_ms), 4),
+        'p99_ms': round(percentile(samples_ms, 0.99), 4),
+        'min_ms': round(min(samples_ms), 4)
+    }
+
+
+def time_calls(func, repeat):
+    """Wall-clock duration of each of repeat calls"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def repeat_for(points, repeat):
+    return repeat or max(3, min(200, AUTO_REPEAT_BUDGET // max(1, points)))
+
+
+def benchmark_analyzer(backend, scenario, history, repeat, bucket_minutes):
+    """Per-analysis latency, full analyze_telemetry latency and peak memory for one history"""
+    analyzer = create_analyzer(backend, bucket_minutes=bucket_minutes)
+    points = len(history)
+    runs = repeat_for(points, repeat)
+    labels = {'backend': backend, 'scenario': scenario, 'points': points}
+    
+    # Same steps as _analyze_telemetry, with each plugin timed on its own
+    timed_history = analyzer._add_time_axis(history)
+    analysis_results = []
+    for plugin in select_analyses():
+        data = analyzer._prepare_data(timed_history, plugin.columns)
+        samples = time_calls(lambda: analyzer._run_analyses(data, len(timed_history), [plugin]), runs)
+        analysis_results.append({**labels, 'analysis': plugin.name, **summarize(samples)})
+    
+    current_data, historical_data = history[-1], history[:-1]
+    analyze = lambda: analyzer.analyze_telemetry('BENCH', current_data, historical_data)
+    end_to_end = {**labels, 'analyzed_points': len(timed_history), **summarize(time_calls(analyze, runs))}
+    
+    tracemalloc.start()
+    try:
+        analyze()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    payload = encode_body({
+        'mac_address': 'BENCH',
+        'current_data': current_data,
+        'historical_data': historical_data
+    })
+    memory = {**labels, 'peak_kib': round(peak / 1024, 1), 'payload_bytes': len(payload)}
+    
+    return analysis_results, end_to_end, memory
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_service(host, port, timeout=15):
+    """Poll GET /health until the service answers or timeout passes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def start_service(backend, workers, bucket_minutes):
+    """Run standalone_ml_service.py on a free port with the prediction cache disabled"""
+    port = free_port()
+    command = [
+        sys.executable, SERVICE_SCRIPT,
+        '--port', str(port),
+        '--backend', backend,
+        '--workers', str(workers),
+        '--max-queue', '1024',
+        '--cache-size', '0',
+        '--bucket-minutes', str(bucket_minutes)
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_service('127.0.0.1', port):
+        process.kill()
+        raise RuntimeError(f'ML service did not start on port {port}')
+    return process, f'http://127.0.0.1:{port}'
+
+
+def process_peak_rss_kib(pid):
+    """Peak resident set size of another process, where /proc is available"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def own_peak_rss_kib():
+    """Peak resident set size of this process, where getrusage is available"""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+def run_http_load(url, body_template, concurrency, total_requests, timeout=60):
+    """
+    POST /predict total_requests times from concurrency keep-alive clients.
+    Every request gets its own MAC address so cached predictions never answer.
+    """
+    target = urlparse(url)
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    
+    def client():
+        connection = http.client.HTTPConnection(target.hostname, target.port, timeout=timeout)
+        while True:
+            index = next(counter)
+            if index >= total_requests:
+                break
+            body = body_template.replace(b'__BENCH_MAC__', f'BENCH-{index}'.encode())
+            started = time.perf_counter()
+            try:
+                connection.request('POST', '/predict', body, {'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                (latencies if ok else errors).append(elapsed)
+        connection.close()
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - started
+    
+    result = {
+        'requests': total_requests,
+        'errors': len(errors),
+        'throughput_rps': round(len(latencies) / wall_time, 2) if wall_time else None
+    }
+    if latencies:
+        latencies_ms = [latency * 1000 for latency in latencies]
+        result['p50_ms'] = round(percentile(latencies_ms, 0.50), 3)
+        result['p99_ms'] = round(percentile(latencies_ms, 0.99), 3)
+    return result
+
+
+def benchmark_http(args, backend, log):
+    """End-to-end /predict latency for each history size and concurrency level"""
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_service(backend, args.service_workers, args.bucket_minutes)
+    
+    results = []
+    try:
+        for points in args.http_sizes:
+            history = generate_history(args.http_scenario, points, args.interval_minutes, args.seed)
+            body_template = encode_body({
+                'mac_address': '__BENCH_MAC__',
+                'current_data': history[-1],
+                'historical_data': history[:-1]
+            })
+            for concurrency in args.concurrency:
+                log(f"🌐 /predict {points} points x{concurrency} ({backend})")
+                result = run_http_load(url, body_template, concurrency, args.http_requests)
+                results.append({
+                    'backend': backend if process else 'external',
+                    'scenario': args.http_scenario,
+                    'points': points,
+                    'concurrency': concurrency,
+                    **result
+                })
+        if process:
+            peak_rss = process_peak_rss_kib(process.pid)
+            for result in results:
+                result['service_peak_rss_kib'] = peak_rss
+    finally:
+        if process:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return results
+
+
+def git_revision():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=5)
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(args, log):
+    results = {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'commit': git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': args.sizes,
+            'scenarios': args.scenarios,
+            'bucket_minutes': args.bucket_minutes,
+            'interval_minutes': args.interval_minutes,
+            'seed': args.seed
+        },
+        'analysis': [],
+        'end_to_end': [],
+        'memory': [],
+        'http': []
+    }
+    
+    for backend in args.backends:
+        for scenario in args.scenarios:
+            for points in args.sizes:
+                log(f"⏱️  {backend} {scenario} {points} points")
+                history = generate_history(scenario, points, args.interval_minutes, args.seed)
+                analysis, end_to_end, memory = benchmark_analyzer(
+                    backend, scenario, history, args.repeat, args.bucket_minutes
+                )
+                results['analysis'].extend(analysis)
+                results['end_to_end'].append(end_to_end)
+                results['memory'].append(memory)
+        
+        if not args.skip_http:
+            results['http'].extend(benchmark_http(args, backend, log))
+            if args.url:
+                break
+    
+    results['meta']['benchmark_peak_rss_kib'] = own_peak_rss_kib()
+    return results
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Ratios of current to baseline metrics for records present in both runs.
+    Returns (all comparisons, comparisons slower than threshold).
+    """
+    comparisons = []
+    for section, (key_fields, metrics) in COMPARED_METRICS.items():
+        baseline_records = {
+            tuple(record.get(field) for field in key_fields): record
+            for record in baseline.get(section, [])
+        }
+        for record in current.get(section, []):
+            key = tuple(record.get(field) for field in key_fields)
+            base = baseline_records.get(key)
+            if base is None:
+                continue
+            for metric in metrics:
+                before, after = base.get(metric), record.get(metric)
+                if not before or after is None:
+                    continue
+                comparisons.append({
+                    'section': section,
+                    'key': dict(zip(key_fields, key)),
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'ratio': round(after / before, 3)
+                })
+    regressions = [comparison for comparison in comparisons if comparison['ratio'] > threshold]
+    return comparisons, regressions
+
+
+def print_summary(results, log):
+    log("\n📊 analyze_telemetry (median / p99 ms, peak KiB)")
+    memory = {(m['backend'], m['scenario'], m['points']): m for m in results['memory']}
+    for record in results['end_to_end']:
+        peak = memory.get((record['backend'], record['scenario'], record['points']), {}).get('peak_kib')
+        log(f"   {record['backend']:<7} {record['scenario']:<22} {record['points']:>6} pts  "
+            f"{record['median_ms']:>10.3f} {record['p99_ms']:>10.3f}  {peak}")
+    if results['http']:
+        log("\n📊 POST /predict (p50 / p99 ms, req/s)")
+        for record in results['http']:
+            log(f"   {record['backend']:<8} {record['points']:>6} pts x{record['concurrency']:<3} "
+                f"{record.get('p50_ms', float('nan')):>10.3f} {record.get('p99_ms', float('nan')):>10.3f} "
+                f"{record['throughput_rps']:>9}  errors={record['errors']}")
+
+
+def parse_sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(',') if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected comma-separated integers, got {value!r}')
+    if not sizes or any(size < 1 for size in sizes):
+        raise argparse.ArgumentTypeError('sizes must be positive integers')
+    return sizes
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the ML analysis service')
+    parser.add_argument('--sizes', type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help='History lengths to analyze in-process (default: 10,100,1000,10000)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='Comma-separated scenarios from generate_test_data.py (default: all)')
+    parser.add_argument('--backends', default='all',
+                        help='Comma-separated analyzer backends, or all installed (default: all)')
+    parser.add_argument('--repeat', type=int, default=0,
+                        help='Timed runs per measurement; 0 scales runs down as histories grow '
+                             '(default: 0)')
+    parser.add_argument('--bucket-minutes', type=int, default=DEFAULT_BUCKET_MINUTES,
+                        help=f'Analyzer bucket size in minutes (default: {DEFAULT_BUCKET_MINUTES})')
+    parser.add_argument('--interval-minutes', type=int, default=DEFAULT_INTERVAL_MINUTES,
+                        help='Minutes between generated telemetry points '
+                             f'(default: {DEFAULT_INTERVAL_MINUTES})')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the scenario generators (default: 0)')
+    parser.add_argument('--skip-http', action='store_true',
+                        help='Only run the in-process analyzer benchmarks')
+    parser.add_argument('--url',
+                        help='Load an already running service instead of starting one per backend')
+    parser.add_argument('--http-sizes', type=parse_sizes, default=list(DEFAULT_HTTP_SIZES),
+                        help='History lengths sent to /predict (default: 100,1000)')
+    parser.add_argument('--http-scenario', default='degrading_performance', choices=list(SCENARIOS),
+                        help='Scenario used for /predict payloads (default: degrading_performance)')
+    parser.add_argument('--concurrency', type=parse_sizes, default=list(DEFAULT_CONCURRENCY),
+                        help='Concurrent keep-alive clients to test (default: 1,8,32)')
+    parser.add_argument('--http-requests', type=int, default=DEFAULT_HTTP_REQUESTS,
+                        help=f'Requests per concurrency level (default: {DEFAULT_HTTP_REQUESTS})')
+    parser.add_argument('--service-workers', type=int, default=32,
+                        help='--workers passed to the service started for HTTP runs (default: 32)')
+    parser.add_argument('--output',
+                        help='Write results JSON to this file instead of stdout')
+    parser.add_argument('--compare',
+                        help='Baseline results JSON; report metrics that got slower')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='Current/baseline ratio reported as a regression '
+                             f'(default: {DEFAULT_REGRESSION_THRESHOLD})')
+    
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+    
+    available = [name for name in ANALYZER_BACKENDS if name != 'numpy' or np is not None]
+    if args.backends == 'all':
+        args.backends = available
+    else:
+        args.backends = [name.strip() for name in args.backends.split(',') if name.strip()]
+        missing = [name for name in args.backends if name not in available]
+        if missing:
+            parser.error(f"unavailable backends: {', '.join(missing)} (available: {', '.join(available)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    
+    log("🏁 ML service benchmark")
+    results = run_benchmarks(args, log)
+    print_summary(results, log)
+    
+    encoded = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(encoded + '\n')
+        log(f"\n💾 Results written to {args.output}")
+    else:
+        print(encoded)
+    
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        comparisons, regressions = compare_results(baseline, results, args.threshold)
+        log(f"\n🔍 Compared {len(comparisons)} metrics against {args.compare} "
+            f"(commit {baseline.get('meta', {}).get('commit')})")
+        for regression in regressions:
+            key = ' '.join(f'{field}={value}' for field, value in regression['key'].items())
+            log(f"   ⚠️  {regression['section']} {key} {regression['metric']}: "
+                f"{regression['baseline']} -> {regression['current']} (x{regression['ratio']})")
+        if regressions:
+            log(f"❌ {len(regressions)} metrics slower than x{args.threshold}")
+            return 1
+        log("✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,69 +1,953 @@
 #!/usr/bin/env python3
 """
 Standalone ML Analysis Service for IT Asset Management
-Uses only Python built-in libraries - no external dependencies required
+Uses only Python built-in libraries - no external dependencies required.
+If NumPy is installed, a vectorized analyzer backend is used automatically.
 """
 
+import argparse
+import array
+import bisect
+import cmath
+import cProfile
+import functools
+import hashlib
+import heapq
 import json
+import mmap
+import operator
+import os
+import pstats
+import select
+import signal
+import socket
 import statistics
+import struct
+import sys
 import math
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 import time
 
-class SimplifiedMLAnalyzer:
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_QUEUE_TIMEOUT = 10
+# Seconds clients are asked to wait after a 503
+RETRY_AFTER_SECONDS = 1
+DEFAULT_ANOMALY_WINDOW = 10
+DEFAULT_STATE_HISTORY = 100
+DEFAULT_STATE_MAX_ASSETS = 10000
+DEFAULT_EWMA_ALPHA = 0.1
+DEFAULT_SNAPSHOT_INTERVAL = 300
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CACHE_TTL = 600
+DEFAULT_BUCKET_MINUTES = 60
+DEFAULT_KEEPALIVE_TIMEOUT = 5
+DEFAULT_KEEPALIVE_MAX_REQUESTS = 100
+# Seconds between checks for queued connections while a keep-alive connection is idle
+KEEPALIVE_POLL_INTERVAL = 0.1
+DEFAULT_CONFIG_POLL_INTERVAL = 5
+DEFAULT_FLEET_TOP_K = 10
+MAX_STREAM_LINE_BYTES = 1 << 20
+STREAM_READ_SIZE = 1 << 16
+# Storage only grows between cleanups, so it has no stable level to learn a baseline for
+BASELINE_METRICS = ('cpu_percent', 'ram_percent')
+BASELINE_QUANTILES = (1, 5, 25, 50, 75, 95, 99)
+HOURS_PER_WEEK = 168
+# Histories shorter than this are not turned into a baseline
+MIN_BASELINE_POINTS = 24
+# Hour-of-week slots with fewer points fall back to the asset's overall statistics
+MIN_BASELINE_SLOT_POINTS = 4
+BASELINE_MAGIC = b'RCBL'
+BASELINE_VERSION = 2
+# Seconds between checks for a baseline store replaced by train_baselines.py
+BASELINE_CHECK_INTERVAL = 1
+TENANT_HEADER = 'X-Tenant-ID'
+DEFAULT_TENANT = 'default'
+MIN_PERIODICITY_POINTS = 12
+PERIODICITY_THRESHOLD = 0.3
+MAX_REPORTED_PERIODS = 3
+# Upper bounds in seconds of the request and analysis duration histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_STATS_LIMIT = 30
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPES = ('application/msgpack', 'application/x-msgpack')
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Health score penalties as (threshold, penalty) bands, highest threshold
+# first; a metric loses the penalty of the first band it exceeds.
+DEFAULT_HEALTH_THRESHOLDS = {
+    'cpu_percent': ((90, 25), (80, 15), (70, 8)),
+    'ram_percent': ((95, 25), (85, 15), (75, 8)),
+    'storage_percent': ((95, 20), (90, 12), (85, 6)),
+    'temperature': ((85, 15), (75, 8), (65, 3)),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def regression_constants(n):
+    """
+    Centered sample indices (x - x_mean) and their sum of squares for a
+    least-squares slope over n points, so a slope is one dot product.
+    """
+    x_mean = (n - 1) / 2
+    x_centered = tuple(i - x_mean for i in range(n))
+    return x_centered, sum(x * x for x in x_centered)
+
+
+@functools.lru_cache(maxsize=1024)
+def regression_constants_array(n):
+    """regression_constants as a read-only NumPy array for the vectorized backend"""
+    x_centered, denominator = regression_constants(n)
+    x_centered = np.array(x_centered)
+    x_centered.flags.writeable = False
+    return x_centered, denominator
+
+
+def parse_timestamp(value):
+    """
+    Convert a telemetry timestamp to epoch seconds, or None if unusable.
+    Accepts ISO-8601 strings, epoch seconds/milliseconds and {"$date": ...}.
+    """
+    if isinstance(value, dict):
+        value = value.get('$date')
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction results with a time-to-live.
+    Keys are hashes of the full request, so retried or repeated /predict
+    calls with the same history skip the analyzers entirely. Values are
+    stored JSON-encoded and every get decodes a fresh copy, so a caller
+    changing its result cannot alter what later hits receive.
+    """
+    
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(*parts):
+        """Fingerprint JSON-serializable request parts"""
+        encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            expires_at, value = entry
+            if self.ttl and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(value)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def put(self, key, value):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class LatencyHistogram:
+    """Durations counted into fixed buckets, plus their sum"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # The last count is the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+    
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+    
+    def cumulative(self):
+        """(upper bound label, observations at or below it) pairs, ending with +Inf"""
+        bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+        running = 0
+        pairs = []
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class ServiceMetrics:
+    """
+    Request counters, in-flight gauges and per-analysis timings for
+    GET /metrics, kept per process. Handlers record every request and
+    analyzers record each plugin's wall time and failures.
+    """
+    
     def __init__(self):
+        self.started_at = time.time()
+        self._rejections = {}
+        self._requests = {}
+        self._in_flight = {}
+        self._request_durations = {}
+        self._analysis_durations = {}
+        self._analysis_failures = {}
+        self._lock = threading.Lock()
+    
+    def request_started(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+    
+    def request_finished(self, endpoint, method, status, seconds):
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._histogram(self._request_durations, endpoint).observe(seconds)
+    
+    def observe_analysis(self, analysis, seconds):
+        with self._lock:
+            self._histogram(self._analysis_durations, analysis).observe(seconds)
+    
+    def analysis_failed(self, analysis):
+        with self._lock:
+            self._analysis_failures[analysis] = self._analysis_failures.get(analysis, 0) + 1
+    
+    def request_rejected(self, reason):
+        with self._lock:
+            self._rejections[reason] = self._rejections.get(reason, 0) + 1
+    
+    @staticmethod
+    def _histogram(histograms, label):
+        if label not in histograms:
+            histograms[label] = LatencyHistogram()
+        return histograms[label]
+    
+    def render(self, extra=()):
+        """
+        Prometheus text exposition format. extra holds additional
+        (name, type, help, value) samples such as cache statistics.
+        """
+        lines = []
+        
+        def family(name, metric_type, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+        
+        def histograms(name, help_text, label_name, source):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for label, histogram in sorted(source.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{_format_labels({label_name: label, "le": bound})} {count}')
+                lines.append(f'{name}_sum{_format_labels({label_name: label})} {histogram.total!r}')
+                lines.append(f'{name}_count{_format_labels({label_name: label})} {sum(histogram.counts)}')
+        
+        with self._lock:
+            family('ml_requests_total', 'counter', 'HTTP requests served',
+                   [({'endpoint': endpoint, 'method': method, 'status': status}, count)
+                    for (endpoint, method, status), count in sorted(self._requests.items())])
+            family('ml_requests_in_flight', 'gauge', 'HTTP requests currently being handled',
+                   [({'endpoint': endpoint}, count) for endpoint, count in sorted(self._in_flight.items())])
+            histograms('ml_request_duration_seconds', 'Time to handle an HTTP request',
+                       'endpoint', self._request_durations)
+            histograms('ml_analysis_duration_seconds', 'Wall time of one analysis plugin run',
+                       'analysis', self._analysis_durations)
+            # Every analysis is listed so a first failure is not a new series
+            failures = {name: 0 for name in [*ANALYSIS_REGISTRY, 'pipeline']}
+            failures.update(self._analysis_failures)
+            family('ml_analysis_errors_total', 'counter',
+                   'Analyses that failed and were left out of the predictions',
+                   [({'analysis': name}, count) for name, count in sorted(failures.items())])
+            rejections = {reason: 0 for reason in ('capacity', 'queue_timeout', 'tenant_limit')}
+            rejections.update(self._rejections)
+            family('ml_rejected_requests_total', 'counter',
+                   'Requests answered with 503 by admission control',
+                   [({'reason': reason}, count) for reason, count in sorted(rejections.items())])
+        
+        family('ml_uptime_seconds', 'gauge', 'Seconds since the service started',
+               [({}, round(time.time() - self.started_at, 3))])
+        for name, metric_type, help_text, value in extra:
+            family(name, metric_type, help_text, [({}, value)])
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    """Prometheus label set, e.g. {endpoint="/predict",status="200"}"""
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels.items()
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+class TenantLimiter:
+    """
+    Caps the analysis requests each tenant can have in progress, so one
+    tenant flooding the service gets fast 503s while the others still
+    reach a worker. A limit of 0 disables the cap.
+    """
+    
+    def __init__(self, max_per_tenant=0):
+        self.max_per_tenant = max(0, max_per_tenant)
+        self._active = {}
+        self._lock = threading.Lock()
+    
+    def try_acquire(self, tenant):
+        with self._lock:
+            active = self._active.get(tenant, 0)
+            if self.max_per_tenant and active >= self.max_per_tenant:
+                return False
+            self._active[tenant] = active + 1
+            return True
+    
+    def release(self, tenant):
+        with self._lock:
+            active = self._active[tenant] - 1
+            # Forget idle tenants so the table only holds busy ones
+            if active:
+                self._active[tenant] = active
+            else:
+                del self._active[tenant]
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'max_per_tenant': self.max_per_tenant,
+                'active': dict(self._active)
+            }
+
+
+def build_health_thresholds(overrides=None):
+    """
+    Health threshold table with per-metric overrides merged over the defaults.
+    Bands are sorted highest threshold first; raises ValueError on bad input.
+    """
+    table = dict(DEFAULT_HEALTH_THRESHOLDS)
+    for metric, bands in (overrides or {}).items():
+        if metric not in DEFAULT_HEALTH_THRESHOLDS:
+            raise ValueError(f'Unknown health threshold metric: {metric}')
+        try:
+            bands = tuple((threshold, penalty) for threshold, penalty in bands)
+        except (TypeError, ValueError):
+            raise ValueError(f'Health thresholds for {metric} must be [threshold, penalty] pairs')
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                   for band in bands for value in band):
+            raise ValueError(f'Health thresholds for {metric} must be numbers')
+        table[metric] = tuple(sorted(bands, reverse=True))
+    return table
+
+
+def hour_of_week(timestamp):
+    """Hour-of-week slot of an epoch timestamp, 0 being Monday 00:00 UTC"""
+    # The epoch fell on a Thursday, 72 hours into its week
+    return (int(timestamp // 3600) + 72) % HOURS_PER_WEEK
+
+
+def learn_baseline(points):
+    """
+    Baseline of one asset's telemetry history: overall mean, stdev and
+    quantiles per metric, plus mean and stdev for every hour of the week
+    (from points with a timestamp). Returns None for short histories.
+    """
+    if len(points) < MIN_BASELINE_POINTS:
+        return None
+    
+    slots = []
+    slot_counts = [0] * HOURS_PER_WEEK
+    for point in points:
+        timestamp = parse_timestamp(point.get('timestamp'))
+        slot = hour_of_week(timestamp) if timestamp is not None else None
+        if slot is not None:
+            slot_counts[slot] += 1
+        slots.append(slot)
+    
+    metrics = {}
+    for metric in BASELINE_METRICS:
+        values = [
+            (float(point[metric]), slot) for point, slot in zip(points, slots)
+            if isinstance(point.get(metric), (int, float)) and not isinstance(point.get(metric), bool)
+        ]
+        if len(values) < MIN_BASELINE_POINTS:
+            continue
+        
+        series = [value for value, _ in values]
+        cut_points = statistics.quantiles(series, n=100, method='inclusive')
+        sums = [0.0] * HOURS_PER_WEEK
+        squares = [0.0] * HOURS_PER_WEEK
+        counts = [0] * HOURS_PER_WEEK
+        for value, slot in values:
+            if slot is not None:
+                sums[slot] += value
+                squares[slot] += value * value
+                counts[slot] += 1
+        
+        slot_means = []
+        slot_stdevs = []
+        for total, square, count in zip(sums, squares, counts):
+            if not count:
+                slot_means.append(math.nan)
+                slot_stdevs.append(math.nan)
+                continue
+            mean = total / count
+            variance = (square - count * mean * mean) / (count - 1) if count > 1 else 0.0
+            slot_means.append(mean)
+            slot_stdevs.append(math.sqrt(max(0.0, variance)))
+        
+        metrics[metric] = {
+            'mean': statistics.fmean(series),
+            'stdev': statistics.stdev(series),
+            'quantiles': [cut_points[q - 1] for q in BASELINE_QUANTILES],
+            'slot_means': slot_means,
+            'slot_stdevs': slot_stdevs
+        }
+    
+    if not metrics:
+        return None
+    return {'points': len(points), 'slot_counts': slot_counts, 'metrics': metrics}
+
+
+class BaselineStore:
+    """
+    Per-asset baselines learned offline by train_baselines.py, kept in one
+    memory-mapped file: a header, the sorted 64-bit hashes of the MAC
+    addresses, then a fixed-size float32 record per asset. The file is
+    opened on the first lookup and records are read in place, so a store
+    for a whole fleet costs neither startup time nor heap memory. A file
+    replaced by a new training run is re-opened on the next lookup.
+    """
+    
+    # magic, version, metrics, quantiles, slots, assets, created_at
+    HEADER = struct.Struct('<4sHHHHId')
+    KEY = struct.Struct('<Q')
+    FLOAT = struct.Struct('<f')
+    SUMMARY = struct.Struct(f'<{2 + len(BASELINE_QUANTILES)}f')
+    # Per metric: mean, stdev, quantiles, slot means, slot stdevs
+    METRIC_FLOATS = 2 + len(BASELINE_QUANTILES) + 2 * HOURS_PER_WEEK
+    METRIC_INDEX = {metric: index for index, metric in enumerate(BASELINE_METRICS)}
+    # Slot point counts, then each metric
+    RECORD_SIZE = 4 * (HOURS_PER_WEEK + len(BASELINE_METRICS) * METRIC_FLOATS)
+    
+    def __init__(self, path):
+        self.path = path
+        self.assets = 0
+        self.created_at = None
+        self._mmap = None
+        # (inode, mtime, size) of the file last opened, None before the first lookup
+        self.signature = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(mac_address):
+        digest = hashlib.blake2b(str(mac_address).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+    
+    @classmethod
+    def write(cls, path, baselines):
+        """Write {mac_address: learn_baseline(...)} to path atomically; returns the number of assets"""
+        records = sorted((cls.key(mac_address), baseline) for mac_address, baseline in baselines.items()
+                         if baseline is not None)
+        keys = [key for key, _ in records]
+        if len(set(keys)) != len(keys):
+            raise ValueError('MAC address hash collision, baselines cannot be stored')
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(BASELINE_MAGIC, BASELINE_VERSION, len(BASELINE_METRICS),
+                                    len(BASELINE_QUANTILES), HOURS_PER_WEEK, len(records), time.time()))
+            f.write(struct.pack(f'<{len(keys)}Q', *keys))
+            for _, baseline in records:
+                floats = array.array('f', baseline['slot_counts'])
+                for metric in BASELINE_METRICS:
+                    stats = baseline['metrics'].get(metric)
+                    if stats is None:
+                        floats.extend([math.nan] * cls.METRIC_FLOATS)
+                        continue
+                    floats.extend([stats['mean'], stats['stdev'], *stats['quantiles'],
+                                   *stats['slot_means'], *stats['slot_stdevs']])
+                if sys.byteorder == 'big':
+                    floats.byteswap()
+                f.write(floats.tobytes())
+        os.replace(temp_path, path)
+        return len(records)
+    
+    def refresh(self):
+        """
+        Re-open the store when its file was replaced since the last check,
+        at most every BASELINE_CHECK_INTERVAL seconds; returns its signature
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < BASELINE_CHECK_INTERVAL:
+            return self.signature
+        self._checked_at = now
+        
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # A removed file keeps serving the store already mapped
+            signature = self.signature if self._mmap is not None else ('missing',)
+        if signature != self.signature:
+            self._open(signature)
+        return self.signature
+    
+    def _open(self, signature):
+        with self._lock:
+            if signature == self.signature:
+                return
+            self.signature = signature
+            try:
+                with open(self.path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, metrics, quantiles, slots, assets, created_at = self.HEADER.unpack_from(mapped, 0)
+                if (magic, version, metrics, quantiles, slots) != (
+                        BASELINE_MAGIC, BASELINE_VERSION, len(BASELINE_METRICS),
+                        len(BASELINE_QUANTILES), HOURS_PER_WEEK):
+                    raise ValueError('unsupported baseline store format')
+                if len(mapped) != self.HEADER.size + assets * (self.KEY.size + self.RECORD_SIZE):
+                    raise ValueError('baseline store is truncated')
+            except (OSError, ValueError, struct.error) as e:
+                # Anomaly scores fall back to the request history until the file changes again
+                print(f"⚠️  Baseline store {self.path} unavailable: {e}")
+                self.assets = 0
+                self.created_at = None
+                self._mmap = None
+                return
+            if self._mmap is not None:
+                print(f"🔄 Baseline store {self.path} re-opened: {assets} assets")
+            # Lookups still holding the previous map keep reading it until they finish
+            self.assets = assets
+            self.created_at = created_at
+            self._mmap = mapped
+    
+    def find(self, mac_address):
+        """(map, offset) of the asset's record, or None when it has no baseline"""
+        self.refresh()
+        mapped, assets = self._mmap, self.assets
+        if mapped is None:
+            return None
+        
+        key = self.key(mac_address)
+        low, high = 0, assets
+        while low < high:
+            middle = (low + high) // 2
+            if self.KEY.unpack_from(mapped, self.HEADER.size + self.KEY.size * middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == assets or self.KEY.unpack_from(mapped, self.HEADER.size + self.KEY.size * low)[0] != key:
+            return None
+        return mapped, self.HEADER.size + self.KEY.size * assets + self.RECORD_SIZE * low
+    
+    def expected(self, record, metric, slot=None):
+        """
+        (mean, stdev, quantiles) of a metric in an asset record, using the
+        hour-of-week slot when it has enough points
+        """
+        mapped, offset = record
+        base = offset + 4 * (HOURS_PER_WEEK + self.METRIC_INDEX[metric] * self.METRIC_FLOATS)
+        mean, stdev, *quantiles = self.SUMMARY.unpack_from(mapped, base)
+        
+        if slot is not None and self.FLOAT.unpack_from(mapped, offset + 4 * slot)[0] >= MIN_BASELINE_SLOT_POINTS:
+            slots_base = base + 4 * (2 + len(BASELINE_QUANTILES))
+            slot_mean = self.FLOAT.unpack_from(mapped, slots_base + 4 * slot)[0]
+            slot_stdev = self.FLOAT.unpack_from(mapped, slots_base + 4 * (HOURS_PER_WEEK + slot))[0]
+            if math.isfinite(slot_mean) and math.isfinite(slot_stdev) and slot_stdev > 0:
+                return slot_mean, slot_stdev, quantiles
+        return mean, stdev, quantiles
+    
+    def stats(self):
+        return {
+            'path': self.path,
+            'loaded': self._mmap is not None,
+            'assets': self.assets,
+            'created_at': self.created_at
+        }
+
+
+class AnalysisPlugin:
+    """One named analysis in the prediction pipeline"""
+    
+    def __init__(self, name, method_name, min_points, columns, output_key=None, description=''):
+        self.name = name
+        self.method_name = method_name
+        # Analyses are skipped for histories shorter than this
+        self.min_points = min_points
+        # Telemetry fields the analysis reads
+        self.columns = tuple(columns)
+        # Results are merged into the predictions unless nested under output_key
+        self.output_key = output_key
+        self.description = description
+    
+    def describe(self):
+        return {
+            'name': self.name,
+            'description': self.description,
+            'minimum_data_points': self.min_points,
+            'columns': list(self.columns)
+        }
+
+
+# Analyses in the order they run; every analyzer backend implements each method_name
+ANALYSIS_REGISTRY = OrderedDict()
+
+
+def register_analysis(name, min_points, columns, output_key=None, description=''):
+    """Decorator registering an analyzer method as a pipeline plugin"""
+    def decorator(method):
+        ANALYSIS_REGISTRY[name] = AnalysisPlugin(name, method.__name__, min_points, columns,
+                                                 output_key, description)
+        return method
+    return decorator
+
+
+def select_analyses(names=None):
+    """Plugins for the requested analysis names, in pipeline order (all when names is None)"""
+    if names is None:
+        return list(ANALYSIS_REGISTRY.values())
+    
+    unknown = [name for name in names if name not in ANALYSIS_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(unknown)}. "
+                         f"Available: {', '.join(ANALYSIS_REGISTRY)}")
+    return [plugin for name, plugin in ANALYSIS_REGISTRY.items() if name in names]
+
+
+class SimplifiedMLAnalyzer:
+    def __init__(self, anomaly_window=DEFAULT_ANOMALY_WINDOW, prediction_cache=None,
+                 health_thresholds=None, bucket_minutes=DEFAULT_BUCKET_MINUTES, metrics=None,
+                 baselines=None):
         self.min_data_points = 3
+        # Number of most recent points checked for recent_anomaly_count
+        self.anomaly_window = max(1, anomaly_window)
+        self.health_thresholds = build_health_thresholds(health_thresholds)
+        # Trend fits on timestamped history average it into buckets of this many minutes;
+        # 0 fits against the sample index instead
+        self.bucket_minutes = max(0, bucket_minutes)
+        self.prediction_cache = prediction_cache
+        # ServiceMetrics receiving per-analysis timings and failures, if any
+        self.metrics = metrics
+        # Learned per-asset baselines replace history z-scores in anomaly scoring
+        self.baselines = BaselineStore(baselines) if baselines else None
+        # Settings that change results are part of every cache key
+        self._cache_namespace = PredictionCache.make_key(
+            type(self).__name__, self.anomaly_window, self.health_thresholds, self.bucket_minutes, baselines
+        )
+    
+    def analyze_telemetry(self, mac_address, current_data, historical_data, analyses=None, use_cache=True):
+        """
+        Perform statistical analysis on telemetry data, answering from the
+        prediction cache when the same request was analyzed recently.
+        analyses optionally limits the run to a subset of ANALYSIS_REGISTRY;
+        use_cache=False bypasses the cache for both lookup and store.
+        """
+        if self.prediction_cache is None or not use_cache:
+            return self._analyze_telemetry(mac_address, current_data, historical_data, analyses)
         
-    def analyze_telemetry(self, mac_address, current_data, historical_data):
+        key = PredictionCache.make_key(
+            self._cache_namespace,
+            # A retrained baseline store must not be answered from results of the old one
+            self.baselines.refresh() if self.baselines is not None else None,
+            sorted(analyses) if analyses is not None else None,
+            mac_address, current_data, historical_data
+        )
+        predictions = self.prediction_cache.get(key)
+        if predictions is None:
+            predictions = self._analyze_telemetry(mac_address, current_data, historical_data, analyses)
+            self.prediction_cache.put(key, predictions)
+        return predictions
+    
+    def _analyze_telemetry(self, mac_address, current_data, historical_data, analyses=None):
         """
         Perform statistical analysis on telemetry data
         """
         try:
             # Prepare data
             all_data = historical_data + [current_data]
+            plugins = select_analyses(analyses)
             
-            if len(all_data) < self.min_data_points:
-                return self._generate_basic_predictions(current_data)
-            
-            # Perform various analyses
-            predictions = {}
-            
-            # Storage analysis
-            storage_predictions = self._analyze_storage_trends(all_data)
-            predictions.update(storage_predictions)
+            # With a learned baseline, anomaly scoring is a lookup instead of statistics over the history
+            baseline_predictions = {}
+            record = self._find_baseline(mac_address) if any(p.name == 'anomaly' for p in plugins) else None
+            if record is not None:
+                baseline_predictions = self._baseline_anomalies(record, current_data, historical_data)
+                plugins = [plugin for plugin in plugins if plugin.name != 'anomaly']
             
-            # Memory analysis
-            memory_predictions = self._analyze_memory_patterns(all_data)
-            predictions.update(memory_predictions)
-            
-            # CPU analysis
-            cpu_predictions = self._analyze_cpu_patterns(all_data)
-            predictions.update(cpu_predictions)
+            if len(all_data) < self.min_data_points:
+                return {**self._generate_basic_predictions(current_data), **baseline_predictions}
             
-            # Health trajectory
-            health_predictions = self._analyze_health_trajectory(all_data)
-            predictions.update(health_predictions)
+            all_data = self._add_time_axis(all_data)
+            columns = {column for plugin in plugins for column in plugin.columns}
+            predictions = self._run_analyses(self._prepare_data(all_data, columns), len(all_data), plugins)
+            predictions.update(baseline_predictions)
+            return predictions
             
-            # Anomaly detection
-            anomaly_analysis = self._detect_simple_anomalies(all_data)
-            predictions.update(anomaly_analysis)
+        except Exception as e:
+            self._analysis_failed('pipeline', f"ML Analysis error: {e}")
+            return self._generate_basic_predictions(current_data)
+    
+    def _find_baseline(self, mac_address):
+        """Record of the asset in the baseline store, or None"""
+        if self.baselines is None:
+            return None
+        return self.baselines.find(mac_address)
+    
+    def _baseline_anomalies(self, record, current_data, historical_data):
+        """
+        Score the newest point against the asset's learned baseline for its
+        hour of the week; the recent anomaly count scores the last
+        anomaly_window points the same way. Outputs match the history-based
+        anomaly analysis, plus the per-metric deviations.
+        """
+        predictions = {}
+        started = time.perf_counter()
+        
+        try:
+            # The newest point is taken to be now when it carries no timestamp
+            timestamp = parse_timestamp(current_data.get('timestamp'))
+            deviations = {}
+            scores = self._baseline_scores(record, current_data,
+                                           timestamp if timestamp is not None else time.time(), deviations)
+            if scores:
+                avg_z_score = sum(scores) / len(scores)
+                predictions['anomaly_score'] = round(avg_z_score, 3)
+                predictions['is_anomaly'] = avg_z_score > 2.0
+                predictions['anomaly_baseline'] = deviations
+                
+                recent_anomaly_count = 1 if avg_z_score > 2.0 else 0
+                recent_points = historical_data[max(0, len(historical_data) - self.anomaly_window + 1):]
+                for point in recent_points:
+                    point_timestamp = parse_timestamp(point.get('timestamp'))
+                    if point_timestamp is None:
+                        continue
+                    point_scores = self._baseline_scores(record, point, point_timestamp)
+                    if point_scores and sum(point_scores) / len(point_scores) > 2.0:
+                        recent_anomaly_count += 1
+                predictions['recent_anomaly_count'] = recent_anomaly_count
+        
+        except Exception as e:
+            self._analysis_failed('anomaly', f"Baseline anomaly detection error: {e}")
+        
+        if self.metrics is not None:
+            self.metrics.observe_analysis('anomaly', time.perf_counter() - started)
+        return predictions
+    
+    def _baseline_scores(self, record, point, timestamp, deviations=None):
+        """Z-scores of a point's metrics against the baseline; fills deviations per metric if given"""
+        scores = []
+        slot = hour_of_week(timestamp)
+        
+        for metric in BASELINE_METRICS:
+            value = point.get(metric)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            mean, stdev, quantiles = self.baselines.expected(record, metric, slot)
+            if not (math.isfinite(mean) and math.isfinite(stdev)) or stdev <= 0:
+                continue
             
-            # Resource exhaustion timeline
-            exhaustion_timeline = self._predict_resource_exhaustion(all_data)
-            predictions['resource_exhaustion_timeline'] = exhaustion_timeline
+            z_score = abs((value - mean) / stdev)
+            scores.append(z_score)
+            if deviations is None:
+                continue
+            # Highest learned quantile the value reaches, 0 when below all of them
+            reached = bisect.bisect_right(quantiles, value)
+            deviations[metric] = {
+                'expected': round(mean, 2),
+                'z_score': round(z_score, 3),
+                'percentile': BASELINE_QUANTILES[reached - 1] if reached else 0
+            }
+        
+        return scores
+    
+    def _add_time_axis(self, data):
+        """
+        Give every timestamped point an 'hours' offset from the first one,
+        used as the regression x-axis so gaps while a machine sleeps stay
+        gaps. The samples themselves are left as they are: variance, z-score
+        and periodicity analyses need the raw series, and only the trend fits
+        bucket it (see _bucket_series). Without a timestamp on every point, or
+        with bucket_minutes 0, the sample index is the x-axis.
+        """
+        if not self.bucket_minutes:
+            return data
+        
+        times = [parse_timestamp(d.get('timestamp')) for d in data]
+        if None in times:
+            return data
+        
+        origin = min(times)
+        return [dict(point, hours=(t - origin) / 3600) for t, point in zip(times, data)]
+    
+    def _bucket_series(self, values, hours):
+        """
+        Average a series into bucket_minutes buckets of its time axis so dense
+        stretches of telemetry do not outweigh sparse ones in a trend fit.
+        The newest point is kept as is. Returns (values, hours) lists.
+        """
+        bucket_hours = self.bucket_minutes / 60
+        buckets = {}
+        for value, hour in zip(values[:-1], hours[:-1]):
+            bucket = buckets.setdefault(math.floor(hour / bucket_hours), [[], []])
+            bucket[0].append(value)
+            bucket[1].append(hour)
+        
+        bucketed_values = [math.fsum(v) / len(v) for v, _ in buckets.values()] + [values[-1]]
+        bucketed_hours = [math.fsum(h) / len(h) for _, h in buckets.values()] + [hours[-1]]
+        return bucketed_values, bucketed_hours
+    
+    @staticmethod
+    def _time_axis(data):
+        """Hours since the first point if _add_time_axis set them, else None (sample index)"""
+        if data and 'hours' in data[-1]:
+            return [d['hours'] for d in data]
+        return None
+    
+    @staticmethod
+    def _days_to_reach(distance, slope, hours):
+        """
+        Days for a trend to cover distance. Slopes on the time axis are per
+        hour; on the sample index (hours is None) a health sample counts as
+        a day, as it did before trends were fitted against timestamps.
+        """
+        per_day = slope * 24 if hours is not None else slope
+        return distance / abs(per_day)
+    
+    def _prepare_data(self, data, columns):
+        """Convert the telemetry history into the form the analysis methods take"""
+        return data
+    
+    def _run_analyses(self, data, data_points, plugins):
+        """Run analysis plugins over prepared data"""
+        predictions = {}
+        
+        for plugin in plugins:
+            if data_points < plugin.min_points:
+                result = {}
+            elif self.metrics is None:
+                result = getattr(self, plugin.method_name)(data)
+            else:
+                result = self._timed_analysis(plugin, data)
             
-            # Performance analysis
-            performance_analysis = self._analyze_performance_degradation(all_data)
-            predictions.update(performance_analysis)
+            if plugin.output_key:
+                predictions[plugin.output_key] = result
+            else:
+                predictions.update(result)
+        
+        return predictions
+    
+    def _timed_analysis(self, plugin, data):
+        """Run one plugin and record its wall time in the service metrics"""
+        started = time.perf_counter()
+        try:
+            return getattr(self, plugin.method_name)(data)
+        finally:
+            self.metrics.observe_analysis(plugin.name, time.perf_counter() - started)
+    
+    def _analysis_failed(self, analysis, message):
+        """Log a failed analysis and count it in the service metrics"""
+        print(message)
+        if self.metrics is not None:
+            self.metrics.analysis_failed(analysis)
+    
+    def analyze_batch(self, assets, analyses=None, use_cache=True):
+        """
+        Run analyze_telemetry over many assets in one call.
+        Returns (predictions keyed by MAC, errors keyed by MAC or item index)
+        """
+        predictions = {}
+        errors = {}
+        
+        for index, asset in enumerate(assets):
+            if not isinstance(asset, dict):
+                errors[str(index)] = 'Asset entry must be an object'
+                continue
             
-            return predictions
+            key = asset.get('mac_address') or str(index)
+            validation_error = validate_prediction_request(asset)
+            if validation_error:
+                errors[key] = validation_error
+                continue
             
-        except Exception as e:
-            print(f"ML Analysis error: {e}")
-            return self._generate_basic_predictions(current_data)
+            try:
+                predictions[key] = self.analyze_telemetry(
+                    mac_address=asset['mac_address'],
+                    current_data=asset['current_data'],
+                    historical_data=asset['historical_data'],
+                    analyses=analyses,
+                    use_cache=use_cache
+                )
+            except Exception as e:
+                print(f"Batch prediction error for {key}: {e}")
+                errors[key] = f'Analysis failed: {str(e)}'
+        
+        return predictions, errors
     
+    @register_analysis('storage', min_points=5, columns=['storage_percent'],
+                       description='Storage growth, time to full, acceleration and volatility')
     def _analyze_storage_trends(self, data):
         """Storage trend analysis using linear regression"""
         predictions = {}
@@ -73,9 +957,10 @@ class SimplifiedMLAnalyzer:
         
         try:
             storage_values = [d.get('storage_percent', 0) for d in data]
+            hours = self._time_axis(data)
             
             # Simple linear regression
-            slope = self._calculate_simple_slope(storage_values)
+            slope = self._calculate_simple_slope(storage_values, hours)
             
             # Predict storage full
             current_storage = storage_values[-1]
@@ -91,11 +976,9 @@ class SimplifiedMLAnalyzer:
         
             # Growth acceleration
             if len(storage_values) >= 7:
-                recent_values = storage_values[-7:]
-                older_values = storage_values[:-7] if len(storage_values) > 7 else storage_values[:3]
-                
-                recent_growth = self._calculate_simple_slope(recent_values)
-                historical_growth = self._calculate_simple_slope(older_values)
+                older = slice(None, -7) if len(storage_values) > 7 else slice(None, 3)
+                recent_growth = self._calculate_simple_slope(storage_values[-7:], hours and hours[-7:])
+                historical_growth = self._calculate_simple_slope(storage_values[older], hours and hours[older])
                 
                 predictions['storage_growth_acceleration'] = round(recent_growth - historical_growth, 2)
             
@@ -106,10 +989,12 @@ class SimplifiedMLAnalyzer:
                 predictions['storage_volatility'] = round(volatility, 2)
                 
         except Exception as e:
-            print(f"Storage analysis error: {e}")
+            self._analysis_failed('storage', f"Storage analysis error: {e}")
         
         return predictions
     
+    @register_analysis('memory', min_points=5, columns=['ram_percent'],
+                       description='Memory leak probability, pressure timing and volatility')
     def _analyze_memory_patterns(self, data):
         """Memory analysis with leak detection"""
         predictions = {}
@@ -122,7 +1007,7 @@ class SimplifiedMLAnalyzer:
             
             # Memory leak detection
             if len(memory_values) >= 7:
-                slope = self._calculate_simple_slope(memory_values)
+                slope = self._calculate_simple_slope(memory_values, self._time_axis(data))
                 variance = statistics.variance(memory_values) if len(memory_values) > 1 else 0
                 
                 # Leak probability indicators
@@ -162,10 +1047,12 @@ class SimplifiedMLAnalyzer:
                 predictions['memory_pressure_risk'] = round(min(1.0, base_risk + leak_influence), 2)
                 
         except Exception as e:
-            print(f"Memory analysis error: {e}")
+            self._analysis_failed('memory', f"Memory analysis error: {e}")
         
         return predictions
     
+    @register_analysis('cpu', min_points=5, columns=['cpu_percent'],
+                       description='CPU spike probability and baseline shift')
     def _analyze_cpu_patterns(self, data):
         """CPU pattern analysis"""
         predictions = {}
@@ -196,10 +1083,54 @@ class SimplifiedMLAnalyzer:
                 predictions['cpu_baseline_shift'] = round(baseline_shift, 2)
                     
         except Exception as e:
-            print(f"CPU analysis error: {e}")
+            self._analysis_failed('cpu', f"CPU analysis error: {e}")
+        
+        return predictions
+    
+    @register_analysis('periodicity', min_points=MIN_PERIODICITY_POINTS,
+                       columns=['cpu_percent', 'ram_percent', 'timestamp'],
+                       description='Dominant CPU/memory periods from the autocorrelation')
+    def _detect_usage_periodicity(self, data):
+        """Find recurring CPU and memory usage cycles of any length"""
+        return self._periodicity_predictions(
+            {
+                'cpu': [d.get('cpu_percent', 0) for d in data],
+                'memory': [d.get('ram_percent', 0) for d in data],
+            },
+            self._sample_interval_hours([parse_timestamp(d.get('timestamp')) for d in data])
+        )
+    
+    def _periodicity_predictions(self, series, interval_hours):
+        """Report the strongest autocorrelation peaks for each named series"""
+        predictions = {}
+        
+        for prefix, values in series.items():
+            try:
+                periods = self._detect_periods(values)
+                if not periods:
+                    continue
+                
+                lag, strength = periods[0]
+                predictions[f'{prefix}_periodicity_detected'] = True
+                predictions[f'{prefix}_period_samples'] = lag
+                predictions[f'{prefix}_period_hours'] = round(lag * interval_hours, 2)
+                predictions[f'{prefix}_period_strength'] = round(strength, 2)
+                predictions[f'{prefix}_periods'] = [
+                    {
+                        'samples': lag,
+                        'hours': round(lag * interval_hours, 2),
+                        'strength': round(strength, 2),
+                    }
+                    for lag, strength in periods
+                ]
+            except Exception as e:
+                self._analysis_failed('periodicity', f"{prefix.upper()} periodicity error: {e}")
         
         return predictions
     
+    @register_analysis('health', min_points=7,
+                       columns=['cpu_percent', 'ram_percent', 'storage_percent', 'temperature'],
+                       description='Health score trends and days to critical')
     def _analyze_health_trajectory(self, data):
         """Predict system health trajectory"""
         predictions = {}
@@ -210,30 +1141,33 @@ class SimplifiedMLAnalyzer:
         try:
             # Calculate health scores
             health_scores = [self._calculate_health_score(d) for d in data]
+            hours = self._time_axis(data)
             
             # Short-term trend (last 7 points)
             if len(health_scores) >= 7:
                 recent_scores = health_scores[-7:]
-                slope_7d = self._calculate_simple_slope(recent_scores)
+                slope_7d = self._calculate_simple_slope(recent_scores, hours and hours[-7:])
                 predictions['health_trend_7_days'] = round(slope_7d, 2)
             
             # Long-term trend
             if len(health_scores) >= 15:
-                slope_30d = self._calculate_simple_slope(health_scores)
+                slope_30d = self._calculate_simple_slope(health_scores, hours)
                 predictions['health_trend_30_days'] = round(slope_30d, 2)
                 
                 # Predict critical threshold
                 current_health = health_scores[-1]
                 if slope_30d < 0 and current_health > 50:
-                    days_to_critical = (current_health - 50) / abs(slope_30d)
+                    days_to_critical = self._days_to_reach(current_health - 50, slope_30d, hours)
                     if 0 < days_to_critical < 365:
                         predictions['critical_threshold_days'] = round(days_to_critical, 1)
                         
         except Exception as e:
-            print(f"Health trajectory error: {e}")
+            self._analysis_failed('health', f"Health trajectory error: {e}")
         
         return predictions
     
+    @register_analysis('anomaly', min_points=5, columns=['cpu_percent', 'ram_percent', 'storage_percent'],
+                       description='Z-score anomaly score and recent anomaly count')
     def _detect_simple_anomalies(self, data):
         """Simple anomaly detection using statistical methods"""
         predictions = {}
@@ -242,21 +1176,20 @@ class SimplifiedMLAnalyzer:
             return predictions
         
         try:
-            current_data = data[-1]
-            
-            # Calculate z-scores for each metric
+            n = len(data)
             metrics = ['cpu_percent', 'ram_percent', 'storage_percent']
-            anomaly_scores = []
             
+            # One pass per metric gives mean/stdev of every prefix data[:i]
+            metric_values = {metric: [d.get(metric, 0) for d in data] for metric in metrics}
+            prefix_stats = {metric: self._prefix_mean_stdev(values) for metric, values in metric_values.items()}
+            
+            # Calculate z-scores of the current point against all earlier points
+            anomaly_scores = []
             for metric in metrics:
-                values = [d.get(metric, 0) for d in data]
-                if len(values) > 1:
-                    mean_val = statistics.mean(values[:-1])  # Exclude current
-                    stdev_val = statistics.stdev(values[:-1]) if len(values) > 2 else 1
-                    
-                    if stdev_val > 0:
-                        z_score = abs((current_data.get(metric, 0) - mean_val) / stdev_val)
-                        anomaly_scores.append(z_score)
+                mean_val, stdev_val = prefix_stats[metric][n - 1]
+                if stdev_val > 0:
+                    z_score = abs((metric_values[metric][-1] - mean_val) / stdev_val)
+                    anomaly_scores.append(z_score)
             
             # Overall anomaly score
             if anomaly_scores:
@@ -264,18 +1197,14 @@ class SimplifiedMLAnalyzer:
                 predictions['anomaly_score'] = round(avg_z_score, 3)
                 predictions['is_anomaly'] = avg_z_score > 2.0  # 2 standard deviations
                 
-                # Count recent anomalies
+                # Count recent anomalies, each point scored against the points before it
                 recent_anomaly_count = 0
-                for i in range(max(0, len(data) - 10), len(data)):
+                for i in range(max(2, n - self.anomaly_window), n):
                     point_scores = []
                     for metric in metrics:
-                        values = [d.get(metric, 0) for d in data[:i+1]]
-                        if len(values) > 2:
-                            mean_val = statistics.mean(values[:-1])
-                            stdev_val = statistics.stdev(values[:-1])
-                            if stdev_val > 0:
-                                z_score = abs((values[-1] - mean_val) / stdev_val)
-                                point_scores.append(z_score)
+                        mean_val, stdev_val = prefix_stats[metric][i]
+                        if stdev_val > 0:
+                            point_scores.append(abs((metric_values[metric][i] - mean_val) / stdev_val))
                     
                     if point_scores and statistics.mean(point_scores) > 2.0:
                         recent_anomaly_count += 1
@@ -283,10 +1212,31 @@ class SimplifiedMLAnalyzer:
                 predictions['recent_anomaly_count'] = recent_anomaly_count
                 
         except Exception as e:
-            print(f"Anomaly detection error: {e}")
+            self._analysis_failed('anomaly', f"Anomaly detection error: {e}")
         
         return predictions
     
+    def _prefix_mean_stdev(self, values):
+        """
+        Welford's algorithm over values; entry i holds (mean, sample stdev)
+        of values[:i]. Stdev is 0 for prefixes shorter than two points.
+        """
+        stats = [(0.0, 0.0)]
+        mean = 0.0
+        m2 = 0.0
+        
+        for count, value in enumerate(values, start=1):
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            stdev = math.sqrt(max(0.0, m2) / (count - 1)) if count > 1 else 0.0
+            stats.append((mean, stdev))
+        
+        return stats
+    
+    @register_analysis('exhaustion', min_points=5, columns=['cpu_percent', 'ram_percent', 'storage_percent'],
+                       output_key='resource_exhaustion_timeline',
+                       description='Time until CPU, memory and storage reach critical levels')
     def _predict_resource_exhaustion(self, data):
         """Predict resource exhaustion timeline"""
         timeline = {}
@@ -295,12 +1245,13 @@ class SimplifiedMLAnalyzer:
             return timeline
         
         current_data = data[-1]
+        hours = self._time_axis(data)
         
         try:
             # CPU exhaustion
             if current_data.get('cpu_percent', 0) > 80:
                 cpu_values = [d.get('cpu_percent', 0) for d in data]
-                slope = self._calculate_simple_slope(cpu_values)
+                slope = self._calculate_simple_slope(cpu_values, hours)
                 
                 if slope > 0:
                     hours_to_95 = (95 - current_data.get('cpu_percent', 0)) / slope
@@ -310,7 +1261,7 @@ class SimplifiedMLAnalyzer:
             # Memory exhaustion
             if current_data.get('ram_percent', 0) > 80:
                 memory_values = [d.get('ram_percent', 0) for d in data]
-                slope = self._calculate_simple_slope(memory_values)
+                slope = self._calculate_simple_slope(memory_values, hours)
                 
                 if slope > 0:
                     hours_to_95 = (95 - current_data.get('ram_percent', 0)) / slope
@@ -320,7 +1271,7 @@ class SimplifiedMLAnalyzer:
             # Storage exhaustion
             if current_data.get('storage_percent', 0) > 85:
                 storage_values = [d.get('storage_percent', 0) for d in data]
-                slope = self._calculate_simple_slope(storage_values)
+                slope = self._calculate_simple_slope(storage_values, hours)
                 
                 if slope > 0:
                     hours_to_98 = (98 - current_data.get('storage_percent', 0)) / slope
@@ -328,10 +1279,12 @@ class SimplifiedMLAnalyzer:
                         timeline['storage_critical_days'] = round(hours_to_98 / 24, 1)
                         
         except Exception as e:
-            print(f"Resource exhaustion prediction error: {e}")
+            self._analysis_failed('exhaustion', f"Resource exhaustion prediction error: {e}")
         
         return timeline
     
+    @register_analysis('performance', min_points=5, columns=['cpu_percent', 'ram_percent', 'storage_percent'],
+                       description='Performance degradation risk and trend')
     def _analyze_performance_degradation(self, data):
         """Analyze performance degradation"""
         predictions = {}
@@ -359,70 +1312,136 @@ class SimplifiedMLAnalyzer:
             
             # Performance trend
             if len(performance_scores) >= 5:
-                slope = self._calculate_simple_slope(performance_scores)
+                slope = self._calculate_simple_slope(performance_scores, self._time_axis(data))
                 predictions['performance_trend'] = round(slope, 2)
                 
         except Exception as e:
-            print(f"Performance analysis error: {e}")
+            self._analysis_failed('performance', f"Performance analysis error: {e}")
         
         return predictions
     
-    def _calculate_simple_slope(self, values):
-        """Calculate slope using simple linear regression"""
-        if len(values) < 2:
+    def _calculate_simple_slope(self, values, x_values=None):
+        """
+        Calculate slope using simple linear regression against x_values
+        (hours for timestamped data, bucketed first) or, by default, the sample index
+        """
+        if x_values is not None and self.bucket_minutes and len(values) > 1:
+            values, x_values = self._bucket_series(list(values), list(x_values))
+        
+        n = len(values)
+        if n < 2:
             return 0
         
+        if x_values is None:
+            x_centered, denominator = regression_constants(n)
+        else:
+            x_mean = math.fsum(x_values) / n
+            x_centered = [x - x_mean for x in x_values]
+            denominator = math.fsum(x * x for x in x_centered)
+            if denominator <= 0:
+                return 0
+        y_mean = math.fsum(values) / n
+        
+        numerator = sum(map(operator.mul, x_centered, [v - y_mean for v in values]))
+        return numerator / denominator
+    
+    def _detect_periods(self, values, max_periods=MAX_REPORTED_PERIODS):
+        """
+        Find dominant periods as peaks of the autocorrelation function.
+        Returns up to max_periods (lag, strength) pairs, strongest first.
+        Lags are searched from 2 samples up to half the series length.
+        """
+        n = len(values)
+        if n < MIN_PERIODICITY_POINTS or max(values) == min(values):
+            return []
+        
+        acf = self._autocorrelation(self._detrend(values))
+        if acf[0] <= 1e-12 * n:
+            return []
+        
+        # Biased estimate: longer lags overlap fewer samples, so they are
+        # damped instead of letting a handful of points look periodic.
+        r = [float(acf[k] / acf[0]) for k in range(n // 2 + 1)]
+        peaks = [
+            (lag, r[lag]) for lag in range(2, n // 2)
+            if r[lag] > r[lag - 1] and r[lag] >= r[lag + 1] and r[lag] > PERIODICITY_THRESHOLD
+        ]
+        peaks.sort(key=lambda peak: peak[1], reverse=True)
+        return peaks[:max_periods]
+    
+    def _detrend(self, values):
+        """Remove the least-squares line so trends do not read as long periods"""
         n = len(values)
-        x_values = list(range(n))
+        slope = self._calculate_simple_slope(values)
+        intercept = sum(values) / n - slope * (n - 1) / 2
+        return [v - (intercept + slope * i) for i, v in enumerate(values)]
+    
+    def _autocorrelation(self, values):
+        """
+        Autocorrelation at every lag via the Wiener-Khinchin theorem, O(n log n).
+        Zero-padding to at least 2n keeps the circular correlation linear.
+        """
+        n = len(values)
+        size = 1 << (2 * n - 1).bit_length()
+        spectrum = self._fft(list(values) + [0.0] * (size - n))
+        power = [c.real * c.real + c.imag * c.imag for c in spectrum]
+        return [c.real for c in self._fft(power, inverse=True)[:n]]
+    
+    @staticmethod
+    def _fft(values, inverse=False):
+        """Iterative radix-2 Cooley-Tukey FFT; len(values) must be a power of two"""
+        n = len(values)
+        a = [complex(v) for v in values]
         
-        x_mean = statistics.mean(x_values)
-        y_mean = statistics.mean(values)
+        # Bit-reversal permutation
+        j = 0
+        for i in range(1, n):
+            bit = n >> 1
+            while j & bit:
+                j ^= bit
+                bit >>= 1
+            j |= bit
+            if i < j:
+                a[i], a[j] = a[j], a[i]
         
-        numerator = sum((x_values[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-        denominator = sum((x_values[i] - x_mean) ** 2 for i in range(n))
+        sign = 1 if inverse else -1
+        size = 2
+        while size <= n:
+            half = size // 2
+            twiddles = [cmath.exp(sign * 2j * math.pi * k / size) for k in range(half)]
+            for start in range(0, n, size):
+                for k in range(half):
+                    u = a[start + k]
+                    v = a[start + k + half] * twiddles[k]
+                    a[start + k] = u + v
+                    a[start + k + half] = u - v
+            size *= 2
         
-        return numerator / denominator if denominator != 0 else 0
+        if inverse:
+            a = [v / n for v in a]
+        return a
+    
+    def _sample_interval_hours(self, timestamps):
+        """Median spacing of the samples in hours; hourly if timestamps are unusable"""
+        times = sorted(t for t in timestamps if t is not None)
+        gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+        if not gaps:
+            return 1.0
+        return statistics.median(gaps) / 3600
     
     def _calculate_health_score(self, data_point):
         """Calculate health score for a single data point"""
         score = 100
         
-        # CPU health (30% weight)
-        cpu_percent = data_point.get('cpu_percent', 0)
-        if cpu_percent > 90:
-            score -= 25
-        elif cpu_percent > 80:
-            score -= 15
-        elif cpu_percent > 70:
-            score -= 8
-        
-        # Memory health (30% weight)
-        ram_percent = data_point.get('ram_percent', 0)
-        if ram_percent > 95:
-            score -= 25
-        elif ram_percent > 85:
-            score -= 15
-        elif ram_percent > 75:
-            score -= 8
-        
-        # Storage health (25% weight)
-        storage_percent = data_point.get('storage_percent', 0)
-        if storage_percent > 95:
-            score -= 20
-        elif storage_percent > 90:
-            score -= 12
-        elif storage_percent > 85:
-            score -= 6
-        
-        # Temperature health (15% weight)
-        temperature = data_point.get('temperature')
-        if temperature:
-            if temperature > 85:
-                score -= 15
-            elif temperature > 75:
-                score -= 8
-            elif temperature > 65:
-                score -= 3
+        for metric, bands in self.health_thresholds.items():
+            value = data_point.get(metric)
+            # Missing or zero readings (e.g. no temperature sensor) cost nothing
+            if not value:
+                continue
+            for threshold, penalty in bands:
+                if value > threshold:
+                    score -= penalty
+                    break
         
         return max(0, min(100, score))
     
@@ -451,92 +1470,1525 @@ class SimplifiedMLAnalyzer:
         return predictions
 
 
-class MLRequestHandler(BaseHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        self.ml_analyzer = SimplifiedMLAnalyzer()
-        super().__init__(*args, **kwargs)
+class VectorizedMLAnalyzer(SimplifiedMLAnalyzer):
+    """
+    NumPy backend for SimplifiedMLAnalyzer.
+    The history is converted into column arrays once per request and every
+    analysis works on those columns; outputs match the pure-Python analyzer.
+    """
     
-    def do_OPTIONS(self):
-        """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+    def __init__(self, anomaly_window=DEFAULT_ANOMALY_WINDOW, prediction_cache=None,
+                 health_thresholds=None, bucket_minutes=DEFAULT_BUCKET_MINUTES, metrics=None,
+                 baselines=None):
+        if np is None:
+            raise RuntimeError('VectorizedMLAnalyzer requires numpy')
+        super().__init__(anomaly_window=anomaly_window, prediction_cache=prediction_cache,
+                         health_thresholds=health_thresholds, bucket_minutes=bucket_minutes,
+                         metrics=metrics, baselines=baselines)
     
-    def do_GET(self):
-        """Handle GET requests"""
-        parsed_path = urlparse(self.path)
+    def _prepare_data(self, data, columns):
+        """Convert a list of telemetry dicts into one float array per needed column"""
+        arrays = {}
+        for column in columns:
+            if column == 'temperature':
+                # Missing or zero temperature means "no reading", as in _calculate_health_score
+                arrays[column] = np.array([d.get(column) or np.nan for d in data], dtype=float)
+            elif column == 'timestamp':
+                arrays[column] = np.array([parse_timestamp(d.get(column)) for d in data], dtype=float)
+            else:
+                arrays[column] = np.array([d.get(column, 0) for d in data], dtype=float)
         
-        if parsed_path.path == '/health':
-            self._send_json_response({
-                'status': 'healthy',
-                'service': 'ML Analysis Service',
-                'analyzer_type': 'Standalone Statistical',
-                'version': '1.0.0',
-                'dependencies': 'Python built-in libraries only'
-            })
-        elif parsed_path.path == '/model_info':
-            self._send_json_response({
-                'models': {
-                    'storage_prediction': 'Linear Regression (built-in)',
-                    'memory_analysis': 'Statistical Analysis',
-                    'cpu_analysis': 'Statistical Pattern Detection',
-                    'health_trajectory': 'Trend Analysis',
-                    'anomaly_detection': 'Z-Score Analysis'
-                },
-                'features': [
-                    'Storage growth prediction',
-                    'Memory leak detection',
-                    'CPU spike probability',
-                    'Health trajectory forecasting',
-                    'Resource exhaustion timeline',
-                    'Performance degradation analysis'
-                ],
-                'requirements': {
-                    'minimum_data_points': 3,
-                    'dependencies': 'None (Python built-in only)'
-                }
-            })
-        else:
-            self._send_error_response(404, 'Endpoint not found')
+        hours = self._time_axis(data)
+        arrays['hours'] = np.array(hours, dtype=float) if hours is not None else None
+        return arrays
     
-    def do_POST(self):
-        """Handle POST requests"""
-        parsed_path = urlparse(self.path)
+    def _slope(self, values, x_values=None):
+        """Least-squares slope against x_values (hours, bucketed first), or the sample index if None"""
+        if x_values is not None and self.bucket_minutes and len(values) > 1:
+            values, x_values = self._bucket_arrays(values, x_values)
         
-        if parsed_path.path == '/predict':
-            try:
-                # Read request body
-                content_length = int(self.headers.get('Content-Length', 0))
-                post_data = self.rfile.read(content_length)
-                
-                # Parse JSON
-                try:
-                    data = json.loads(post_data.decode('utf-8'))
-                except json.JSONDecodeError:
-                    self._send_error_response(400, 'Invalid JSON data')
+        n = len(values)
+        if n < 2:
+            return 0
+        if x_values is None:
+            x_centered, denominator = regression_constants_array(n)
+        else:
+            x_centered = x_values - x_values.mean()
+            denominator = float(np.dot(x_centered, x_centered))
+            if denominator <= 0:
+                return 0
+        return float(np.dot(x_centered, values - values.mean()) / denominator)
+    
+    def _bucket_arrays(self, values, hours):
+        """_bucket_series on arrays: bucket means of all but the newest point, then the newest"""
+        buckets, index = np.unique(np.floor(hours[:-1] / (self.bucket_minutes / 60)), return_inverse=True)
+        counts = np.bincount(index, minlength=len(buckets))
+        bucketed_values = np.bincount(index, weights=values[:-1], minlength=len(buckets)) / counts
+        bucketed_hours = np.bincount(index, weights=hours[:-1], minlength=len(buckets)) / counts
+        return np.append(bucketed_values, values[-1]), np.append(bucketed_hours, hours[-1])
+    
+    @staticmethod
+    def _window(hours, window):
+        """Slice the time axis like its series; None (sample index) stays None"""
+        return None if hours is None else hours[window]
+    
+    @staticmethod
+    def _mean_stdev(values):
+        """Sample mean and stdev, exact for constant series like the statistics module"""
+        if values.min() == values.max():
+            return float(values[0]), 0.0
+        return float(values.mean()), float(values.std(ddof=1))
+    
+    @staticmethod
+    def _volatility(values):
+        return float(np.abs(np.diff(values)).mean())
+    
+    def _analyze_storage_trends(self, columns):
+        predictions = {}
+        storage_values = columns['storage_percent']
+        n = len(storage_values)
+        
+        if n < 5:
+            return predictions
+        
+        hours = columns['hours']
+        
+        try:
+            slope = self._slope(storage_values, hours)
+            
+            current_storage = float(storage_values[-1])
+            if slope > 0.05:
+                hours_to_full = (100 - current_storage) / slope
+                if 0 < hours_to_full < 8760:
+                    predictions['storage_full_in_days'] = max(1, int(hours_to_full / 24))
+                    
+                    variance = float(storage_values.var(ddof=1))
+                    confidence = max(0.1, min(0.95, 1 - (variance / 100)))
+                    predictions['storage_confidence'] = round(confidence, 2)
+            
+            if n >= 7:
+                recent = slice(-7, None)
+                older = slice(None, -7) if n > 7 else slice(None, 3)
+                acceleration = (self._slope(storage_values[recent], self._window(hours, recent))
+                                - self._slope(storage_values[older], self._window(hours, older)))
+                predictions['storage_growth_acceleration'] = round(acceleration, 2)
+            
+            predictions['storage_volatility'] = round(self._volatility(storage_values), 2)
+                
+        except Exception as e:
+            self._analysis_failed('storage', f"Storage analysis error: {e}")
+        
+        return predictions
+    
+    def _analyze_memory_patterns(self, columns):
+        predictions = {}
+        memory_values = columns['ram_percent']
+        n = len(memory_values)
+        
+        if n < 5:
+            return predictions
+        
+        try:
+            current_memory = float(memory_values[-1])
+            
+            if n >= 7:
+                slope = self._slope(memory_values, columns['hours'])
+                variance = float(memory_values.var(ddof=1))
+                
+                leak_probability = 0
+                if slope > 0.5:
+                    leak_probability += 0.4
+                if variance < 10 and slope > 0:
+                    leak_probability += 0.3
+                if memory_values[n // 2:].mean() > memory_values[:n // 2].mean() + 5:
+                    leak_probability += 0.3
+                
+                predictions['memory_leak_probability'] = round(min(1.0, leak_probability), 2)
+                
+                if slope > 0:
+                    hours_to_pressure = (90 - current_memory) / slope
+                    if 0 < hours_to_pressure < 168:
+                        predictions['memory_pressure_in_hours'] = round(hours_to_pressure, 1)
+            
+            predictions['memory_volatility'] = round(self._volatility(memory_values), 2)
+            
+            if current_memory > 70:
+                base_risk = min(1, (current_memory - 70) / 30)
+                leak_influence = predictions.get('memory_leak_probability', 0) * 0.3
+                predictions['memory_pressure_risk'] = round(min(1.0, base_risk + leak_influence), 2)
+                
+        except Exception as e:
+            self._analysis_failed('memory', f"Memory analysis error: {e}")
+        
+        return predictions
+    
+    def _analyze_cpu_patterns(self, columns):
+        predictions = {}
+        cpu_values = columns['cpu_percent']
+        n = len(cpu_values)
+        
+        if n < 5:
+            return predictions
+        
+        try:
+            cpu_mean, cpu_stdev = self._mean_stdev(cpu_values)
+            
+            threshold = cpu_mean + 1.5 * cpu_stdev
+            spikes = int(np.count_nonzero(cpu_values > threshold))
+            predictions['cpu_spike_probability'] = round(min(1.0, (spikes / n) * 3), 2)
+            
+            if n >= 10:
+                mid_point = n // 2
+                baseline_shift = float(cpu_values[mid_point:].mean() - cpu_values[:mid_point].mean())
+                predictions['cpu_baseline_shift'] = round(baseline_shift, 2)
+                    
+        except Exception as e:
+            self._analysis_failed('cpu', f"CPU analysis error: {e}")
+        
+        return predictions
+    
+    def _detect_usage_periodicity(self, columns):
+        timestamps = columns['timestamp']
+        return self._periodicity_predictions(
+            {'cpu': columns['cpu_percent'], 'memory': columns['ram_percent']},
+            self._sample_interval_hours(timestamps[~np.isnan(timestamps)].tolist())
+        )
+    
+    def _detrend(self, values):
+        n = len(values)
+        slope = self._slope(values)
+        return values - (values.mean() + slope * (np.arange(n) - (n - 1) / 2))
+    
+    def _autocorrelation(self, values):
+        n = len(values)
+        size = 1 << (2 * n - 1).bit_length()
+        spectrum = np.fft.rfft(values, size)
+        return np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, size)[:n]
+    
+    def _health_scores(self, columns):
+        """Vectorized _calculate_health_score over every data point"""
+        penalty = 0
+        for metric, bands in self.health_thresholds.items():
+            values = columns[metric]
+            # NaN temperatures compare False everywhere and add no penalty
+            penalty = penalty + np.select([values > threshold for threshold, _ in bands],
+                                          [band_penalty for _, band_penalty in bands], 0)
+        
+        return np.clip(100 - penalty, 0, 100).astype(float)
+    
+    def _analyze_health_trajectory(self, columns):
+        predictions = {}
+        n = len(columns['cpu_percent'])
+        
+        if n < 7:
+            return predictions
+        
+        try:
+            health_scores = self._health_scores(columns)
+            hours = columns['hours']
+            recent = slice(-7, None)
+            
+            predictions['health_trend_7_days'] = round(
+                self._slope(health_scores[recent], self._window(hours, recent)), 2)
+            
+            if n >= 15:
+                slope_30d = self._slope(health_scores, hours)
+                predictions['health_trend_30_days'] = round(slope_30d, 2)
+                
+                current_health = float(health_scores[-1])
+                if slope_30d < 0 and current_health > 50:
+                    days_to_critical = self._days_to_reach(current_health - 50, slope_30d, hours)
+                    if 0 < days_to_critical < 365:
+                        predictions['critical_threshold_days'] = round(days_to_critical, 1)
+                        
+        except Exception as e:
+            self._analysis_failed('health', f"Health trajectory error: {e}")
+        
+        return predictions
+    
+    @staticmethod
+    def _prefix_mean_stdev_np(values):
+        """
+        Arrays of mean and sample stdev of values[:i] for i in 0..n, from
+        cumulative sums in one pass. Values are shifted by the first sample to
+        limit cancellation, and constant prefixes get an exact zero stdev.
+        """
+        n = len(values)
+        counts = np.arange(1, n + 1)
+        shifted = values - values[0]
+        sums = np.cumsum(shifted)
+        sums_sq = np.cumsum(shifted * shifted)
+        
+        means = np.zeros(n + 1)
+        means[1:] = values[0] + sums / counts
+        
+        stdevs = np.zeros(n + 1)
+        if n > 1:
+            variances = (sums_sq[1:] - sums[1:] ** 2 / counts[1:]) / (counts[1:] - 1)
+            stdevs[2:] = np.sqrt(np.clip(variances, 0, None))
+            constant = np.maximum.accumulate(values) == np.minimum.accumulate(values)
+            stdevs[1:][constant] = 0.0
+        
+        return means, stdevs
+    
+    def _detect_simple_anomalies(self, columns):
+        predictions = {}
+        metrics = ['cpu_percent', 'ram_percent', 'storage_percent']
+        n = len(columns['cpu_percent'])
+        
+        if n < 5:
+            return predictions
+        
+        try:
+            start = max(2, n - self.anomaly_window)
+            anomaly_scores = []
+            # Per-metric z-scores of points start..n-1 against their own prefixes, NaN when stdev is 0
+            window_scores = []
+            
+            for metric in metrics:
+                values = columns[metric]
+                means, stdevs = self._prefix_mean_stdev_np(values)
+                
+                if stdevs[n - 1] > 0:
+                    anomaly_scores.append(abs((float(values[-1]) - means[n - 1]) / stdevs[n - 1]))
+                
+                window_stdevs = stdevs[start:n]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    z_scores = np.abs(values[start:] - means[start:n]) / window_stdevs
+                window_scores.append(np.where(window_stdevs > 0, z_scores, np.nan))
+            
+            if anomaly_scores:
+                avg_z_score = float(sum(anomaly_scores) / len(anomaly_scores))
+                predictions['anomaly_score'] = round(avg_z_score, 3)
+                predictions['is_anomaly'] = avg_z_score > 2.0
+                
+                window_scores = np.vstack(window_scores)
+                scored = ~np.isnan(window_scores)
+                score_counts = scored.sum(axis=0)
+                score_sums = np.where(scored, window_scores, 0).sum(axis=0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    point_means = score_sums / score_counts
+                predictions['recent_anomaly_count'] = int(np.count_nonzero((score_counts > 0) & (point_means > 2.0)))
+                
+        except Exception as e:
+            self._analysis_failed('anomaly', f"Anomaly detection error: {e}")
+        
+        return predictions
+    
+    def _predict_resource_exhaustion(self, columns):
+        timeline = {}
+        
+        if len(columns['cpu_percent']) < 5:
+            return timeline
+        
+        # (metric, alert level, critical level, horizon in hours, output key, hours per output unit)
+        limits = [
+            ('cpu_percent', 80, 95, 168, 'cpu_critical_hours', 1),
+            ('ram_percent', 80, 95, 168, 'memory_critical_hours', 1),
+            ('storage_percent', 85, 98, 8760, 'storage_critical_days', 24),
+        ]
+        
+        try:
+            for metric, alert_level, critical_level, horizon, key, unit in limits:
+                values = columns[metric]
+                current = float(values[-1])
+                if current > alert_level:
+                    slope = self._slope(values, columns['hours'])
+                    if slope > 0:
+                        hours_left = (critical_level - current) / slope
+                        if 0 < hours_left < horizon:
+                            timeline[key] = round(hours_left / unit, 1)
+                        
+        except Exception as e:
+            self._analysis_failed('exhaustion', f"Resource exhaustion prediction error: {e}")
+        
+        return timeline
+    
+    def _analyze_performance_degradation(self, columns):
+        predictions = {}
+        
+        if len(columns['cpu_percent']) < 5:
+            return predictions
+        
+        try:
+            performance_scores = 100 - (
+                columns['cpu_percent'] * 0.4 +
+                columns['ram_percent'] * 0.4 +
+                columns['storage_percent'] * 0.2
+            )
+            
+            current_perf = float(performance_scores[-1])
+            if current_perf < 70:
+                predictions['performance_degradation_risk'] = round((70 - current_perf) / 70, 2)
+            else:
+                predictions['performance_degradation_risk'] = 0.0
+            
+            predictions['performance_trend'] = round(self._slope(performance_scores, columns['hours']), 2)
+                
+        except Exception as e:
+            self._analysis_failed('performance', f"Performance analysis error: {e}")
+        
+        return predictions
+
+
+ANALYZER_BACKENDS = {
+    'python': SimplifiedMLAnalyzer,
+    'numpy': VectorizedMLAnalyzer,
+}
+
+
+def create_analyzer(backend='auto', **options):
+    """Build the analyzer for a backend name; 'auto' prefers NumPy when installed"""
+    if backend == 'auto':
+        backend = 'numpy' if np is not None else 'python'
+    if backend not in ANALYZER_BACKENDS:
+        raise ValueError(f'Unknown analyzer backend: {backend}')
+    return ANALYZER_BACKENDS[backend](**options)
+
+
+class SharedAnalyzer:
+    """
+    The analyzer every request handler uses, built once at startup.
+    Settings come from the command line, overridden by an optional JSON
+    config file; reload() swaps in a freshly built analyzer without a
+    restart while requests already running finish on the old one.
+    """
+    
+    CONFIG_KEYS = ('backend', 'anomaly_window', 'health_thresholds', 'bucket_minutes', 'baselines')
+    
+    def __init__(self, backend='auto', analyzer_options=None, prediction_cache=None, config_file=None,
+                 metrics=None):
+        self.defaults = {'backend': backend, **(analyzer_options or {})}
+        self.prediction_cache = prediction_cache
+        self.metrics = metrics
+        self.config_file = config_file
+        self.settings = dict(self.defaults)
+        self.reloads = 0
+        self.loaded_at = None
+        self._config_mtime = None
+        self._lock = threading.Lock()
+        self.current = None
+        # A broken config file should stop startup, not the first request
+        self.reload()
+    
+    def _read_config(self):
+        if not self.config_file:
+            return {}, None
+        mtime = os.stat(self.config_file).st_mtime
+        with open(self.config_file) as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError('config file must contain a JSON object')
+        unknown = sorted(set(config) - set(self.CONFIG_KEYS))
+        if unknown:
+            raise ValueError(f"Unknown config keys: {', '.join(unknown)}")
+        return config, mtime
+    
+    def reload(self):
+        """Rebuild the analyzer from the defaults plus the config file"""
+        with self._lock:
+            config, mtime = self._read_config()
+            settings = {**self.defaults, **config}
+            options = {key: value for key, value in settings.items() if key != 'backend'}
+            analyzer = create_analyzer(settings['backend'], prediction_cache=self.prediction_cache,
+                                       metrics=self.metrics, **options)
+            
+            if self.current is not None:
+                self.reloads += 1
+                # Old results are keyed by the old settings and can never hit again
+                if self.prediction_cache is not None:
+                    self.prediction_cache.clear()
+            self.current = analyzer
+            self.settings = settings
+            self._config_mtime = mtime
+            self.loaded_at = time.time()
+            return analyzer
+    
+    def reload_if_changed(self, force=False):
+        """Reload when the config file was modified; keeps the current analyzer on errors"""
+        if not self.config_file:
+            return False
+        try:
+            mtime = os.stat(self.config_file).st_mtime
+        except OSError as e:
+            print(f"⚠️  Config reload error, keeping current analyzer: {e}")
+            return False
+        if not force and mtime == self._config_mtime:
+            return False
+        
+        try:
+            self.reload()
+        except (OSError, ValueError, TypeError, RuntimeError) as e:
+            print(f"⚠️  Config reload error, keeping current analyzer: {e}")
+            # Report a broken file once, not on every poll until it is fixed
+            self._config_mtime = mtime
+            return False
+        
+        print(f"🔁 Reloaded analyzer config from {self.config_file}")
+        return True
+    
+    def watch(self, interval=DEFAULT_CONFIG_POLL_INTERVAL):
+        """Poll the config file for changes; returns an Event that stops the loop"""
+        stop_event = threading.Event()
+        
+        def watch_loop():
+            while not stop_event.wait(interval):
+                self.reload_if_changed()
+        
+        if self.config_file and interval > 0:
+            threading.Thread(target=watch_loop, name='config-watch', daemon=True).start()
+        return stop_event
+    
+    def describe(self):
+        return {
+            'backend': type(self.current).__name__,
+            'anomaly_window': self.current.anomaly_window,
+            'bucket_minutes': self.current.bucket_minutes,
+            'baselines': self.current.baselines.stats() if self.current.baselines else None,
+            'config_file': self.config_file,
+            'reloads': self.reloads,
+            'loaded_at': self.loaded_at
+        }
+
+
+class FleetAnalyzer:
+    """
+    Tenant-wide summary over many asset histories in one call: percentiles
+    of current usage, the assets closest to exhausting a resource and the
+    assets that deviate most from their cohort. Per-asset work goes through
+    the shared analyzer (and its cache); only the summary is returned.
+    """
+    
+    METRICS = ('cpu_percent', 'ram_percent', 'storage_percent')
+    PERCENTILES = (50, 90, 95, 99)
+    ANALYSES = ['cpu', 'exhaustion']
+    # Resource exhaustion timeline keys ranked soonest first
+    EXHAUSTION_KEYS = {
+        'storage': 'storage_critical_days',
+        'memory': 'memory_critical_hours',
+        'cpu': 'cpu_critical_hours',
+    }
+    # Scale factor that makes the median absolute deviation comparable to a stdev
+    MAD_SCALE = 1.4826
+    
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+    
+    @staticmethod
+    def duplicate_macs(assets):
+        """MAC addresses given for more than one asset; predictions are keyed by MAC, so each would count twice"""
+        seen = set()
+        duplicates = set()
+        for asset in assets:
+            mac = asset.get('mac_address') if isinstance(asset, dict) else None
+            if not isinstance(mac, str) or not mac:
+                continue
+            if mac in seen:
+                duplicates.add(mac)
+            seen.add(mac)
+        return sorted(duplicates)
+    
+    def analyze(self, assets, top_k=DEFAULT_FLEET_TOP_K, use_cache=True):
+        predictions, errors = self.analyzer.analyze_batch(assets, self.ANALYSES, use_cache)
+        
+        rows = []
+        for index, asset in enumerate(assets):
+            if not isinstance(asset, dict):
+                continue
+            key = asset.get('mac_address') or str(index)
+            if key in predictions:
+                rows.append((key, asset, predictions[key]))
+        
+        baseline_shifts = [p['cpu_baseline_shift'] for _, _, p in rows if 'cpu_baseline_shift' in p]
+        
+        return {
+            'assets_analyzed': len(rows),
+            'failed': len(errors),
+            'errors': errors,
+            'metrics': {
+                metric: self._distribution([asset['current_data'].get(metric, 0) for _, asset, _ in rows])
+                for metric in self.METRICS
+            },
+            'cpu_baseline_shift': self._distribution(baseline_shifts),
+            'exhaustion': self._soonest_exhaustion(rows, top_k),
+            'cohort_anomalies': self._cohort_anomalies(rows, top_k)
+        }
+    
+    def _distribution(self, values):
+        """Mean, max and percentiles of a list of numbers, or None if empty"""
+        if not values:
+            return None
+        
+        summary = {'count': len(values), 'mean': round(math.fsum(values) / len(values), 2)}
+        if np is not None:
+            points = np.percentile(np.asarray(values, dtype=float), self.PERCENTILES).tolist()
+        else:
+            ordered = sorted(values)
+            points = [self._percentile(ordered, q) for q in self.PERCENTILES]
+        for q, point in zip(self.PERCENTILES, points):
+            summary[f'p{q}'] = round(point, 2)
+        summary['max'] = round(max(values), 2)
+        return summary
+    
+    @staticmethod
+    def _percentile(ordered, q):
+        """Linearly interpolated percentile of sorted values, as numpy.percentile"""
+        position = (len(ordered) - 1) * q / 100
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+    
+    def _soonest_exhaustion(self, rows, top_k):
+        """Top-k assets per resource by time to critical, via a heap instead of a full sort"""
+        exhaustion = {}
+        for resource, timeline_key in self.EXHAUSTION_KEYS.items():
+            candidates = []
+            for mac_address, _, prediction in rows:
+                timeline = prediction.get('resource_exhaustion_timeline') or {}
+                if timeline_key in timeline:
+                    candidates.append((timeline[timeline_key], mac_address))
+            
+            unit = timeline_key.rsplit('_', 1)[-1]
+            exhaustion[resource] = [
+                {'mac_address': mac_address, unit: value}
+                for value, mac_address in heapq.nsmallest(top_k, candidates)
+            ]
+        return exhaustion
+    
+    def _cohort_anomalies(self, rows, top_k):
+        """
+        Score each asset's current usage against its cohort (the optional
+        "cohort" label on each asset, else the whole fleet) with robust
+        z-scores: distance from the cohort median in scaled MADs.
+        """
+        cohorts = {}
+        for mac_address, asset, _ in rows:
+            cohorts.setdefault(str(asset.get('cohort', 'fleet')), []).append((mac_address, asset['current_data']))
+        
+        scored = []
+        for cohort, members in cohorts.items():
+            # Too few peers for a meaningful median
+            if len(members) < 3:
+                continue
+            
+            z_scores = {mac_address: {} for mac_address, _ in members}
+            for metric in self.METRICS:
+                values = [current.get(metric, 0) for _, current in members]
+                median = statistics.median(values)
+                mad = statistics.median(abs(v - median) for v in values) * self.MAD_SCALE
+                if mad <= 0:
+                    continue
+                for (mac_address, _), value in zip(members, values):
+                    z_scores[mac_address][metric] = round((value - median) / mad, 2)
+            
+            for mac_address, metric_scores in z_scores.items():
+                if metric_scores:
+                    score = max(abs(z) for z in metric_scores.values())
+                    scored.append((score, cohort, mac_address, metric_scores))
+        
+        return [
+            {'mac_address': mac_address, 'cohort': cohort, 'score': score, 'z_scores': metric_scores}
+            for score, cohort, mac_address, metric_scores in heapq.nlargest(top_k, scored, key=lambda item: item[0])
+        ]
+
+
+class RunningSeries:
+    """
+    Sliding-window sufficient statistics for one telemetry series.
+    Keeps sums, sums of squares and index cross-products so mean, variance,
+    least-squares slope and half means are read in O(1). Not everything is
+    constant time: a push also keeps a sorted copy of the window for
+    count_above, a binary search plus an O(window) list shift, and the
+    prefix queries below cost the length of the suffix they peel off. Sums
+    are taken relative to a pivot value to limit cancellation and are
+    rebuilt from the window every `capacity` updates (O(1) amortized) so
+    float error cannot drift.
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = max(2, capacity)
+        self.values = deque()
+        self.sorted_values = []
+        self._reset_sums(0.0)
+    
+    def _reset_sums(self, pivot):
+        self.pivot = pivot
+        self.sum = 0.0            # sum of (y - pivot)
+        self.sum_sq = 0.0         # sum of (y - pivot)^2
+        self.sum_xy = 0.0         # sum of x * (y - pivot), x = position in window
+        self.abs_diff_sum = 0.0   # sum of |y[i] - y[i-1]|
+        self.head_count = 0       # size of the older half, len // 2
+        self.head_sum = 0.0       # sum of (y - pivot) over the older half
+        self.leading_run = 0      # length of the run of equal values at the window start
+        self.updates_since_rebuild = 0
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def push(self, value):
+        value = float(value)
+        if len(self.values) == self.capacity:
+            self._pop_oldest()
+        
+        n = len(self.values)
+        offset = value - self.pivot
+        if n:
+            self.abs_diff_sum += abs(value - self.values[-1])
+        if self.leading_run == n and (n == 0 or value == self.values[0]):
+            self.leading_run += 1
+        
+        self.values.append(value)
+        bisect.insort(self.sorted_values, value)
+        self.sum += offset
+        self.sum_sq += offset * offset
+        self.sum_xy += n * offset
+        self._balance_head()
+        
+        self.updates_since_rebuild += 1
+        if self.updates_since_rebuild >= self.capacity:
+            self.rebuild()
+    
+    def _pop_oldest(self):
+        old = self.values.popleft()
+        del self.sorted_values[bisect.bisect_left(self.sorted_values, old)]
+        
+        offset = old - self.pivot
+        self.abs_diff_sum -= abs(self.values[0] - old)
+        self.sum -= offset
+        self.sum_sq -= offset * offset
+        # Every remaining point moves one position to the left
+        self.sum_xy -= self.sum
+        self.head_sum -= offset
+        self.head_count -= 1
+        
+        self.leading_run -= 1
+        if self.leading_run == 0:
+            self.leading_run = self._count_leading_run()
+    
+    def _count_leading_run(self):
+        first = self.values[0]
+        count = 0
+        for value in self.values:
+            if value != first:
+                break
+            count += 1
+        return count
+    
+    def _balance_head(self):
+        target = len(self.values) // 2
+        while self.head_count < target:
+            self.head_sum += self.values[self.head_count] - self.pivot
+            self.head_count += 1
+        while self.head_count > target:
+            self.head_count -= 1
+            self.head_sum -= self.values[self.head_count] - self.pivot
+    
+    def rebuild(self):
+        """Recompute every running sum from the window"""
+        values = self.values
+        self._reset_sums(self.sorted_values[len(values) // 2] if values else 0.0)
+        
+        previous = None
+        for x, value in enumerate(values):
+            offset = value - self.pivot
+            self.sum += offset
+            self.sum_sq += offset * offset
+            self.sum_xy += x * offset
+            if previous is not None:
+                self.abs_diff_sum += abs(value - previous)
+            previous = value
+        
+        if values:
+            self.leading_run = self._count_leading_run()
+        self._balance_head()
+    
+    def last(self):
+        return self.values[-1]
+    
+    def tail(self, count):
+        n = len(self.values)
+        return [self.values[i] for i in range(max(0, n - count), n)]
+    
+    def head(self, count):
+        return [self.values[i] for i in range(min(count, len(self.values)))]
+    
+    def is_constant(self):
+        return self.leading_run == len(self.values)
+    
+    def mean(self):
+        if self.is_constant():
+            return self.values[0]
+        return self.pivot + self.sum / len(self.values)
+    
+    def variance(self):
+        """Sample variance, exactly zero for constant windows"""
+        n = len(self.values)
+        if n < 2 or self.is_constant():
+            return 0.0
+        return max(0.0, (self.sum_sq - self.sum * self.sum / n) / (n - 1))
+    
+    def stdev(self):
+        return math.sqrt(self.variance())
+    
+    def slope(self):
+        if self.is_constant():
+            return 0
+        return self._slope_from_sums(len(self.values), self.sum, self.sum_xy)
+    
+    def prefix_slope(self, count):
+        """Slope of values[:count], using the window sums minus the tail; O(len - count)"""
+        if self.leading_run >= count:
+            return 0
+        prefix_sum = self.sum
+        prefix_sum_xy = self.sum_xy
+        for x in range(count, len(self.values)):
+            offset = self.values[x] - self.pivot
+            prefix_sum -= offset
+            prefix_sum_xy -= x * offset
+        return self._slope_from_sums(count, prefix_sum, prefix_sum_xy)
+    
+    @staticmethod
+    def _slope_from_sums(n, sum_y, sum_xy):
+        if n < 2:
+            return 0
+        x_mean = (n - 1) / 2
+        # sum of (x - x_mean)^2 for x in 0..n-1
+        denominator = n * (n * n - 1) / 12
+        return (sum_xy - x_mean * sum_y) / denominator
+    
+    def half_means(self):
+        """(mean of values[:n//2], mean of values[n//2:])"""
+        n = len(self.values)
+        older = self.pivot + self.head_sum / self.head_count
+        recent = self.pivot + (self.sum - self.head_sum) / (n - self.head_count)
+        return older, recent
+    
+    def volatility(self):
+        """Mean absolute difference between consecutive values"""
+        return self.abs_diff_sum / (len(self.values) - 1)
+    
+    def count_above(self, threshold):
+        return len(self.sorted_values) - bisect.bisect_right(self.sorted_values, threshold)
+    
+    def recent_prefix_stats(self, start):
+        """
+        For i in start..n-1 yield (value[i], mean, stdev) where mean/stdev
+        describe values[:i], by peeling suffix sums off the window sums.
+        O(n - start): every prefix changes when the window slides.
+        """
+        n = len(self.values)
+        suffix_sum = 0.0
+        suffix_sq = 0.0
+        stats = []
+        
+        for i in range(n - 1, start - 1, -1):
+            offset = self.values[i] - self.pivot
+            suffix_sum += offset
+            suffix_sq += offset * offset
+            
+            if self.leading_run >= i:
+                # values[:i] is constant
+                mean = self.values[0] if i else 0.0
+                stdev = 0.0
+            else:
+                prefix_sum = self.sum - suffix_sum
+                prefix_sq = self.sum_sq - suffix_sq
+                mean = self.pivot + prefix_sum / i
+                stdev = math.sqrt(max(0.0, (prefix_sq - prefix_sum * prefix_sum / i) / (i - 1)))
+            stats.append((self.values[i], mean, stdev))
+        
+        stats.reverse()
+        return stats
+
+
+class AssetState:
+    """Rolling telemetry window, running statistics and EWMA baselines for one asset"""
+    
+    SERIES = ('cpu_percent', 'ram_percent', 'storage_percent', 'health', 'performance')
+    
+    def __init__(self, capacity):
+        self.points = deque(maxlen=capacity)
+        self.series = {name: RunningSeries(capacity) for name in self.SERIES}
+        self.ewma = {}
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.points)
+
+
+class IncrementalMLAnalyzer(SimplifiedMLAnalyzer):
+    """
+    Stateful analyzer keeping per-MAC running statistics, so a client can
+    post only its newest telemetry point. Each asset keeps the last
+    `history_limit` points (the window a stateless /predict call would send)
+    and predictions equal analyze_telemetry over that window, but are derived
+    from running sums instead of re-scanning the history. The running sums
+    are per sample, so trends use the sample index as their time axis (as
+    analyze_telemetry does with bucket_minutes=0); any other bucket size is
+    refused, since predictions would no longer match. The exceptions to
+    constant-time updates are the recent anomaly count, O(anomaly_window),
+    and periodicity, which reruns its FFT over the whole window and so only
+    runs when requested (see README).
+    """
+    
+    METRICS = ('cpu_percent', 'ram_percent', 'storage_percent')
+    # Analyses left out unless named in the request's analyses
+    OPT_IN_ANALYSES = ('periodicity',)
+    
+    def __init__(self, anomaly_window=DEFAULT_ANOMALY_WINDOW, history_limit=DEFAULT_STATE_HISTORY,
+                 max_assets=DEFAULT_STATE_MAX_ASSETS, ewma_alpha=DEFAULT_EWMA_ALPHA,
+                 health_thresholds=None, bucket_minutes=0, metrics=None, baselines=None):
+        # baselines is accepted so shared analyzer options apply, but not used
+        if bucket_minutes:
+            raise ValueError('Stateful mode fits trends against the sample index and requires '
+                             'bucket_minutes 0')
+        super().__init__(anomaly_window=anomaly_window, health_thresholds=health_thresholds,
+                         bucket_minutes=0, metrics=metrics)
+        self.history_limit = max(self.min_data_points, history_limit)
+        self.max_assets = max(1, max_assets)
+        self.ewma_alpha = ewma_alpha
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def update(self, mac_address, current_data, historical_data=None, reset=False, analyses=None):
+        """
+        Add the newest point for an asset and return (predictions, state summary).
+        historical_data seeds a new (or reset) asset and is ignored otherwise.
+        Raises ValueError for a non-numeric metric, before any state changes.
+        """
+        seed = [self._normalize_point(point) for point in (historical_data or [])[-(self.history_limit - 1):]]
+        current_point = self._normalize_point(current_data)
+        state, created = self._get_state(mac_address, reset)
+        
+        with state.lock:
+            if created:
+                for point in seed:
+                    self._push(state, point)
+            self._push(state, current_point)
+            
+            try:
+                predictions = self._predict_from_state(state, analyses)
+            except Exception as e:
+                self._analysis_failed('pipeline', f"Incremental analysis error: {e}")
+                predictions = self._generate_basic_predictions(current_data)
+            
+            return predictions, self._summarize_state(state)
+    
+    def _get_state(self, mac_address, reset=False):
+        with self._lock:
+            state = None if reset else self._states.get(mac_address)
+            if state is not None:
+                self._states.move_to_end(mac_address)
+                return state, False
+            
+            state = AssetState(self.history_limit)
+            self._states[mac_address] = state
+            while len(self._states) > self.max_assets:
+                self._states.popitem(last=False)
+                self.evictions += 1
+            return state, True
+    
+    def _normalize_point(self, point):
+        """
+        The stored form of a telemetry point. Raises ValueError for a metric
+        that is not a finite number, since one bad value would poison the
+        running sums of the asset's whole window.
+        """
+        if not isinstance(point, dict):
+            raise ValueError('Telemetry points must be objects')
+        
+        normalized = {}
+        for metric in (*self.METRICS, 'temperature'):
+            value = point.get(metric, 0 if metric != 'temperature' else None)
+            if value is None and metric == 'temperature':
+                normalized[metric] = None
+                continue
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or not math.isfinite(value):
+                raise ValueError(f'{metric} must be a number')
+            normalized[metric] = value
+        normalized['timestamp'] = parse_timestamp(point.get('timestamp'))
+        return normalized
+    
+    def _push(self, state, point):
+        """Append a point from _normalize_point to the asset's window"""
+        state.points.append(point)
+        
+        for metric in self.METRICS:
+            state.series[metric].push(point[metric])
+            self._update_ewma(state, metric, point[metric])
+        
+        state.series['health'].push(self._calculate_health_score(point))
+        state.series['performance'].push(100 - (
+            point['cpu_percent'] * 0.4 +
+            point['ram_percent'] * 0.4 +
+            point['storage_percent'] * 0.2
+        ))
+    
+    def _update_ewma(self, state, metric, value):
+        if metric not in state.ewma:
+            state.ewma[metric] = [float(value), 0.0]
+            return
+        mean, variance = state.ewma[metric]
+        delta = value - mean
+        mean += self.ewma_alpha * delta
+        variance = (1 - self.ewma_alpha) * (variance + self.ewma_alpha * delta * delta)
+        state.ewma[metric] = [mean, variance]
+    
+    def _summarize_state(self, state):
+        return {
+            'points': len(state),
+            'baselines': {
+                metric: {
+                    'ewma': round(mean, 3),
+                    'ewma_stdev': round(math.sqrt(variance), 3)
+                }
+                for metric, (mean, variance) in state.ewma.items()
+            }
+        }
+    
+    def _predict_from_state(self, state, analyses=None):
+        """Same outputs as analyze_telemetry over the asset's window"""
+        if len(state) < self.min_data_points:
+            return self._generate_basic_predictions(state.points[-1])
+        if analyses is None:
+            analyses = [name for name in ANALYSIS_REGISTRY if name not in self.OPT_IN_ANALYSES]
+        return self._run_analyses(state, len(state), select_analyses(analyses))
+    
+    def _analyze_storage_trends(self, state):
+        predictions = {}
+        storage = state.series['storage_percent']
+        n = len(storage)
+        if n < 5:
+            return predictions
+        
+        slope = storage.slope()
+        current_storage = storage.last()
+        if slope > 0.05:
+            hours_to_full = (100 - current_storage) / slope
+            if 0 < hours_to_full < 8760:
+                predictions['storage_full_in_days'] = max(1, int(hours_to_full / 24))
+                confidence = max(0.1, min(0.95, 1 - (storage.variance() / 100)))
+                predictions['storage_confidence'] = round(confidence, 2)
+        
+        if n >= 7:
+            recent_growth = self._calculate_simple_slope(storage.tail(7))
+            if n > 7:
+                historical_growth = storage.prefix_slope(n - 7)
+            else:
+                historical_growth = self._calculate_simple_slope(storage.head(3))
+            predictions['storage_growth_acceleration'] = round(recent_growth - historical_growth, 2)
+        
+        predictions['storage_volatility'] = round(storage.volatility(), 2)
+        return predictions
+    
+    def _analyze_memory_patterns(self, state):
+        predictions = {}
+        memory = state.series['ram_percent']
+        n = len(memory)
+        if n < 5:
+            return predictions
+        
+        current_memory = memory.last()
+        if n >= 7:
+            slope = memory.slope()
+            
+            leak_probability = 0
+            if slope > 0.5:
+                leak_probability += 0.4
+            if memory.variance() < 10 and slope > 0:
+                leak_probability += 0.3
+            older_mean, recent_mean = memory.half_means()
+            if recent_mean > older_mean + 5:
+                leak_probability += 0.3
+            
+            predictions['memory_leak_probability'] = round(min(1.0, leak_probability), 2)
+            
+            if slope > 0:
+                hours_to_pressure = (90 - current_memory) / slope
+                if 0 < hours_to_pressure < 168:
+                    predictions['memory_pressure_in_hours'] = round(hours_to_pressure, 1)
+        
+        predictions['memory_volatility'] = round(memory.volatility(), 2)
+        
+        if current_memory > 70:
+            base_risk = min(1, (current_memory - 70) / 30)
+            leak_influence = predictions.get('memory_leak_probability', 0) * 0.3
+            predictions['memory_pressure_risk'] = round(min(1.0, base_risk + leak_influence), 2)
+        return predictions
+    
+    def _analyze_cpu_patterns(self, state):
+        predictions = {}
+        cpu = state.series['cpu_percent']
+        n = len(cpu)
+        if n < 5:
+            return predictions
+        
+        threshold = cpu.mean() + 1.5 * cpu.stdev()
+        predictions['cpu_spike_probability'] = round(min(1.0, (cpu.count_above(threshold) / n) * 3), 2)
+        
+        if n >= 10:
+            older_mean, recent_mean = cpu.half_means()
+            predictions['cpu_baseline_shift'] = round(recent_mean - older_mean, 2)
+        return predictions
+    
+    def _detect_usage_periodicity(self, state):
+        return self._periodicity_predictions(
+            {
+                'cpu': list(state.series['cpu_percent'].values),
+                'memory': list(state.series['ram_percent'].values),
+            },
+            self._sample_interval_hours([p['timestamp'] for p in state.points])
+        )
+    
+    def _analyze_health_trajectory(self, state):
+        predictions = {}
+        health = state.series['health']
+        n = len(health)
+        if n < 7:
+            return predictions
+        
+        predictions['health_trend_7_days'] = round(self._calculate_simple_slope(health.tail(7)), 2)
+        
+        if n >= 15:
+            slope_30d = health.slope()
+            predictions['health_trend_30_days'] = round(slope_30d, 2)
+            
+            current_health = health.last()
+            if slope_30d < 0 and current_health > 50:
+                # The running sums are on the sample index
+                days_to_critical = self._days_to_reach(current_health - 50, slope_30d, None)
+                if 0 < days_to_critical < 365:
+                    predictions['critical_threshold_days'] = round(days_to_critical, 1)
+        return predictions
+    
+    def _detect_simple_anomalies(self, state):
+        predictions = {}
+        n = len(state)
+        if n < 5:
+            return predictions
+        
+        start = max(2, n - self.anomaly_window)
+        # Row per metric: z-score of each point in start..n-1 against the points before it
+        metric_scores = []
+        for metric in self.METRICS:
+            scores = []
+            for value, mean, stdev in state.series[metric].recent_prefix_stats(min(start, n - 1)):
+                scores.append(abs((value - mean) / stdev) if stdev > 0 else None)
+            metric_scores.append(scores)
+        
+        anomaly_scores = [scores[-1] for scores in metric_scores if scores[-1] is not None]
+        if anomaly_scores:
+            avg_z_score = statistics.mean(anomaly_scores)
+            predictions['anomaly_score'] = round(avg_z_score, 3)
+            predictions['is_anomaly'] = avg_z_score > 2.0
+            
+            offset = start - min(start, n - 1)
+            recent_anomaly_count = 0
+            for column in range(offset, len(metric_scores[0])):
+                point_scores = [scores[column] for scores in metric_scores if scores[column] is not None]
+                if point_scores and statistics.mean(point_scores) > 2.0:
+                    recent_anomaly_count += 1
+            predictions['recent_anomaly_count'] = recent_anomaly_count
+        return predictions
+    
+    def _predict_resource_exhaustion(self, state):
+        timeline = {}
+        if len(state) < 5:
+            return timeline
+        
+        limits = [
+            ('cpu_percent', 80, 95, 168, 'cpu_critical_hours', 1),
+            ('ram_percent', 80, 95, 168, 'memory_critical_hours', 1),
+            ('storage_percent', 85, 98, 8760, 'storage_critical_days', 24),
+        ]
+        for metric, alert_level, critical_level, horizon, key, unit in limits:
+            series = state.series[metric]
+            current = series.last()
+            if current > alert_level:
+                slope = series.slope()
+                if slope > 0:
+                    hours = (critical_level - current) / slope
+                    if 0 < hours < horizon:
+                        timeline[key] = round(hours / unit, 1)
+        return timeline
+    
+    def _analyze_performance_degradation(self, state):
+        predictions = {}
+        performance = state.series['performance']
+        if len(performance) < 5:
+            return predictions
+        
+        current_perf = performance.last()
+        if current_perf < 70:
+            predictions['performance_degradation_risk'] = round((70 - current_perf) / 70, 2)
+        else:
+            predictions['performance_degradation_risk'] = 0.0
+        predictions['performance_trend'] = round(performance.slope(), 2)
+        return predictions
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'assets': len(self._states),
+                'max_assets': self.max_assets,
+                'history_limit': self.history_limit,
+                'evictions': self.evictions
+            }
+    
+    def save_snapshot(self, path):
+        """Write every asset window to path atomically, least recently used first"""
+        with self._lock:
+            states = list(self._states.items())
+        
+        assets = {}
+        for mac_address, state in states:
+            with state.lock:
+                assets[mac_address] = {
+                    'points': list(state.points),
+                    'ewma': {metric: list(values) for metric, values in state.ewma.items()}
+                }
+        
+        snapshot = {
+            'version': 1,
+            'saved_at': time.time(),
+            'history_limit': self.history_limit,
+            'assets': assets
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        return len(assets)
+    
+    def load_snapshot(self, path):
+        """Restore asset windows saved by save_snapshot; returns the asset count"""
+        with open(path) as f:
+            snapshot = json.load(f)
+        
+        restored = 0
+        for mac_address, saved in snapshot.get('assets', {}).items():
+            state, _ = self._get_state(mac_address, reset=True)
+            with state.lock:
+                for point in saved.get('points', [])[-self.history_limit:]:
+                    try:
+                        point = self._normalize_point(point)
+                    except ValueError:
+                        # Written before updates were validated
+                        continue
+                    self._push(state, point)
+                # Saved baselines carry more history than the window does
+                state.ewma.update({metric: list(values) for metric, values in saved.get('ewma', {}).items()})
+            restored += 1
+        return restored
+
+
+def encode_body(data, content_type=JSON_CONTENT_TYPE):
+    """Serialize a response as compact JSON or, if requested, MessagePack"""
+    if content_type in MSGPACK_CONTENT_TYPES:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def decode_body(body, content_type=JSON_CONTENT_TYPE):
+    """Parse a request body; raises ValueError if it is not valid for its type"""
+    if content_type in MSGPACK_CONTENT_TYPES:
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise ValueError(f'Invalid MessagePack data: {e}')
+    try:
+        return json.loads(body.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError('Invalid JSON data')
+
+
+def columns_to_rows(columns):
+    """
+    Expand a columnar history ({"cpu_percent": [...], "ram_percent": [...]})
+    into the list of telemetry dicts the analyzers take. A column may also be
+    a packed little-endian float64 array (MessagePack bin) instead of a list.
+    """
+    names = list(columns)
+    values = []
+    for name in names:
+        column = columns[name]
+        if isinstance(column, (bytes, bytearray)):
+            if len(column) % 8:
+                raise ValueError(f'packed column {name} is not a float64 array')
+            packed = array.array('d')
+            packed.frombytes(column)
+            if sys.byteorder == 'big':
+                packed.byteswap()
+            column = packed.tolist()
+        elif not isinstance(column, list):
+            raise ValueError(f'column {name} must be a list or packed float64 array')
+        values.append(column)
+    
+    if len({len(column) for column in values}) > 1:
+        raise ValueError('columns must all have the same length')
+    
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def validate_prediction_request(data):
+    """
+    Return an error message if a /predict payload is malformed, else None.
+    A columnar historical_data object is expanded into rows in place.
+    """
+    required_fields = ['mac_address', 'current_data', 'historical_data']
+    for field in required_fields:
+        if field not in data:
+            return f'Missing required field: {field}'
+    
+    if not isinstance(data['current_data'], dict):
+        return 'current_data must be an object'
+    if isinstance(data['historical_data'], dict):
+        try:
+            data['historical_data'] = columns_to_rows(data['historical_data'])
+        except ValueError as e:
+            return f'Invalid columnar historical_data: {e}'
+    if not isinstance(data['historical_data'], list):
+        return 'historical_data must be a list or an object of columns'
+    
+    required_metrics = ['cpu_percent', 'ram_percent', 'storage_percent']
+    for metric in required_metrics:
+        if metric not in data['current_data']:
+            return f'Missing metric in current_data: {metric}'
+    
+    return None
+
+
+class MLRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests; every response
+    # carries a Content-Length so clients can find where it ends.
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; Nagle would hold the body
+    # back until the client's delayed ACK on a reused connection.
+    disable_nagle_algorithm = True
+    # Paths reported individually in /metrics; anything else is counted as 'other'
+    METRIC_ENDPOINTS = frozenset([
+        '/health', '/stats', '/state', '/model_info', '/metrics', '/predict', '/predict/batch',
+        '/predict/stream', '/fleet/analyze', '/predict/incremental'
+    ])
+    # cProfile cannot trace two threads at once on newer Pythons, so ?profile=1 runs one at a time
+    _profile_lock = threading.Lock()
+    
+    @property
+    def ml_analyzer(self):
+        """The server's shared analyzer, looked up per request so reloads apply at once"""
+        return self.server.shared_analyzer.current
+    
+    def setup(self):
+        # Socket timeout doubles as the idle timeout between keep-alive requests
+        self.timeout = getattr(self.server, 'keepalive_timeout', None)
+        self.requests_handled = 0
+        super().setup()
+    
+    def handle_one_request(self):
+        """Serve one request from the connection and count it against the keep-alive limit"""
+        if self.requests_handled and not self._await_next_request():
+            self.close_connection = True
+            return
+        self._body_read = False
+        self._response_status = None
+        self._profile_requested = False
+        self._profiler = None
+        super().handle_one_request()
+        self.requests_handled += 1
+    
+    def _await_next_request(self):
+        """
+        Wait for the next request on a kept-alive connection. False when the
+        idle timeout passes first, or as soon as other connections are queued
+        for a worker or the server is draining, so an idle client does not
+        hold the worker.
+        """
+        # A request the client already sent may be sitting in the read buffer
+        self.connection.setblocking(False)
+        try:
+            if self.rfile.peek(1):
+                return True
+        finally:
+            self.connection.settimeout(self.timeout)
+        
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        has_waiting_connections = getattr(self.server, 'has_waiting_connections', lambda: False)
+        while not (has_waiting_connections() or getattr(self.server, 'draining', False)):
+            wait = KEEPALIVE_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+            readable, _, _ = select.select([self.connection], [], [], wait)
+            if readable:
+                return True
+        return False
+    
+    def _keep_alive_allowed(self, body_will_be_read=False):
+        """Whether the connection may serve another request after this response"""
+        max_requests = getattr(self.server, 'keepalive_max_requests', DEFAULT_KEEPALIVE_MAX_REQUESTS)
+        if max_requests and self.requests_handled + 1 >= max_requests:
+            return False
+        if getattr(self.server, 'draining', False):
+            return False
+        # A keep-alive connection pins its worker thread, so give it up for queued clients
+        if getattr(self.server, 'has_waiting_connections', lambda: False)():
+            return False
+        # An unread body would be parsed as the next request
+        if not (self._body_read or body_will_be_read) and (int(self.headers.get('Content-Length') or 0) > 0
+                                    or 'chunked' in self.headers.get('Transfer-Encoding', '').lower()):
+            return False
+        return True
+    
+    def do_OPTIONS(self):
+        """Handle CORS preflight requests"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', f'Content-Type, Accept, {TENANT_HEADER}')
+        self.send_header('Content-Length', '0')
+        if not self._keep_alive_allowed():
+            self.send_header('Connection', 'close')
+        self.end_headers()
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        self._instrumented(self._handle_get)
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        self._instrumented(self._admitted_post)
+    
+    def _admitted_post(self):
+        """Run the POST handler within the calling tenant's concurrency limit"""
+        tenant = self.headers.get(TENANT_HEADER, '').strip() or DEFAULT_TENANT
+        tenant_limiter = self.server.tenant_limiter
+        if not tenant_limiter.try_acquire(tenant):
+            self.server.metrics.request_rejected('tenant_limit')
+            self._send_error_response(503, f'Too many requests in progress for tenant {tenant}, retry later',
+                                      headers={'Retry-After': str(RETRY_AFTER_SECONDS)})
+            return
+        
+        try:
+            self._handle_post()
+        finally:
+            tenant_limiter.release(tenant)
+    
+    def _instrumented(self, handler):
+        """Run a request handler, recording it in the service metrics and profiling it on ?profile=1"""
+        parsed_path = urlparse(self.path)
+        endpoint = parsed_path.path if parsed_path.path in self.METRIC_ENDPOINTS else 'other'
+        metrics = self.server.metrics
+        
+        self._profile_requested = parse_qs(parsed_path.query).get('profile', [''])[-1] in ('1', 'true')
+        if self._profile_requested and self._profile_lock.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+        
+        metrics.request_started(endpoint)
+        started = time.perf_counter()
+        try:
+            if self._profiler is not None:
+                self._profiler.enable()
+            handler()
+        finally:
+            if self._profiler is not None:
+                self._profiler.disable()
+                self._profiler = None
+                self._profile_lock.release()
+            metrics.request_finished(endpoint, self.command, self._response_status or 0,
+                                     time.perf_counter() - started)
+    
+    def send_response(self, code, message=None):
+        self._response_status = code
+        super().send_response(code, message)
+    
+    def _handle_get(self):
+        parsed_path = urlparse(self.path)
+        
+        if parsed_path.path == '/health':
+            self._send_json_response({
+                'status': 'healthy',
+                'service': 'ML Analysis Service',
+                'analyzer_type': 'Standalone Statistical',
+                'analyzer_backend': 'numpy' if isinstance(self.ml_analyzer, VectorizedMLAnalyzer) else 'python',
+                'version': '1.0.0',
+                'dependencies': 'Python built-in libraries only (NumPy optional)'
+            })
+        elif parsed_path.path == '/stats':
+            prediction_cache = getattr(self.server, 'prediction_cache', None)
+            incremental_analyzer = getattr(self.server, 'incremental_analyzer', None)
+            self._send_json_response({
+                'analyzer': self.server.shared_analyzer.describe(),
+                'prediction_cache': prediction_cache.stats() if prediction_cache else None,
+                'tenants': self.server.tenant_limiter.stats(),
+                'incremental_state': incremental_analyzer.stats() if incremental_analyzer else None
+            })
+        elif parsed_path.path == '/state':
+            incremental_analyzer = getattr(self.server, 'incremental_analyzer', None)
+            if incremental_analyzer is None:
+                self._send_error_response(404, 'Stateful mode is disabled, start the service with --stateful')
+                return
+            self._send_json_response(incremental_analyzer.stats())
+        elif parsed_path.path == '/metrics':
+            self._send_metrics()
+        elif parsed_path.path == '/model_info':
+            self._send_json_response({
+                'models': {
+                    'storage_prediction': 'Linear Regression (built-in)',
+                    'memory_analysis': 'Statistical Analysis',
+                    'cpu_analysis': 'Statistical Pattern Detection',
+                    'health_trajectory': 'Trend Analysis',
+                    'anomaly_detection': 'Z-Score Analysis'
+                },
+                'features': [
+                    'Storage growth prediction',
+                    'Memory leak detection',
+                    'CPU spike probability',
+                    'CPU and memory periodicity detection (FFT autocorrelation)',
+                    'Health trajectory forecasting',
+                    'Resource exhaustion timeline',
+                    'Performance degradation analysis'
+                ],
+                'analyses': [plugin.describe() for plugin in select_analyses()],
+                'requirements': {
+                    'minimum_data_points': 3,
+                    'dependencies': 'None (Python built-in only)'
+                }
+            })
+        else:
+            self._send_error_response(404, 'Endpoint not found')
+    
+    def _handle_post(self):
+        parsed_path = urlparse(self.path)
+        
+        # ?analyses=storage,anomaly runs only those plugins
+        try:
+            analyses = self._requested_analyses(parsed_path)
+        except ValueError as e:
+            self._send_error_response(400, str(e))
+            return
+        
+        if parsed_path.path == '/predict':
+            try:
+                data = self._read_json_body()
+                if data is None:
                     return
                 
-                # Validate required fields
-                required_fields = ['mac_address', 'current_data', 'historical_data']
-                for field in required_fields:
-                    if field not in data:
-                        self._send_error_response(400, f'Missing required field: {field}')
-                        return
-                
-                # Validate current_data has required metrics
-                required_metrics = ['cpu_percent', 'ram_percent', 'storage_percent']
-                for metric in required_metrics:
-                    if metric not in data['current_data']:
-                        self._send_error_response(400, f'Missing metric in current_data: {metric}')
-                        return
+                # Validate required fields and metrics
+                validation_error = validate_prediction_request(data)
+                if validation_error:
+                    self._send_error_response(400, validation_error)
+                    return
                 
                 # Perform ML analysis
                 predictions = self.ml_analyzer.analyze_telemetry(
                     mac_address=data['mac_address'],
                     current_data=data['current_data'],
-                    historical_data=data['historical_data']
+                    historical_data=data['historical_data'],
+                    analyses=analyses,
+                    # A cached answer would leave the profile without any analyzer work
+                    use_cache=not self._profile_requested
                 )
                 
                 self._send_json_response(predictions)
@@ -544,56 +2996,806 @@ class MLRequestHandler(BaseHTTPRequestHandler):
             except Exception as e:
                 print(f"Prediction error: {e}")
                 self._send_error_response(500, f'Internal server error: {str(e)}')
+        elif parsed_path.path == '/predict/batch':
+            try:
+                data = self._read_json_body()
+                if data is None:
+                    return
+                
+                assets = data.get('assets') if isinstance(data, dict) else None
+                if not isinstance(assets, list):
+                    self._send_error_response(400, 'Missing required field: assets')
+                    return
+                
+                predictions, errors = self.ml_analyzer.analyze_batch(
+                    assets, analyses, use_cache=not self._profile_requested
+                )
+                
+                self._send_json_response({
+                    'predictions': predictions,
+                    'errors': errors,
+                    'processed': len(predictions),
+                    'failed': len(errors)
+                })
+                
+            except Exception as e:
+                print(f"Batch prediction error: {e}")
+                self._send_error_response(500, f'Internal server error: {str(e)}')
+        elif parsed_path.path == '/predict/stream':
+            self._stream_predictions(analyses)
+        elif parsed_path.path == '/fleet/analyze':
+            try:
+                data = self._read_json_body()
+                if data is None:
+                    return
+                
+                assets = data.get('assets')
+                if not isinstance(assets, list):
+                    self._send_error_response(400, 'Missing required field: assets')
+                    return
+                
+                top_k = data.get('top_k', DEFAULT_FLEET_TOP_K)
+                if not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1:
+                    self._send_error_response(400, 'top_k must be a positive integer')
+                    return
+                
+                duplicates = FleetAnalyzer.duplicate_macs(assets)
+                if duplicates:
+                    self._send_error_response(400, f"Duplicate mac_address in assets: {', '.join(duplicates)}")
+                    return
+                
+                self._send_json_response(FleetAnalyzer(self.ml_analyzer).analyze(
+                    assets, top_k, use_cache=not self._profile_requested
+                ))
+                
+            except Exception as e:
+                print(f"Fleet analysis error: {e}")
+                self._send_error_response(500, f'Internal server error: {str(e)}')
+        elif parsed_path.path == '/predict/incremental':
+            incremental_analyzer = getattr(self.server, 'incremental_analyzer', None)
+            if incremental_analyzer is None:
+                self._send_error_response(404, 'Stateful mode is disabled, start the service with --stateful')
+                return
+            
+            try:
+                data = self._read_json_body()
+                if data is None:
+                    return
+                
+                # historical_data is optional here: it only seeds assets the service has not seen
+                data = {'historical_data': [], **data}
+                validation_error = validate_prediction_request(data)
+                if validation_error:
+                    self._send_error_response(400, validation_error)
+                    return
+                
+                try:
+                    predictions, state = incremental_analyzer.update(
+                        mac_address=data['mac_address'],
+                        current_data=data['current_data'],
+                        historical_data=data['historical_data'],
+                        reset=bool(data.get('reset', False)),
+                        analyses=analyses
+                    )
+                except ValueError as e:
+                    self._send_error_response(400, str(e))
+                    return
+                
+                self._send_json_response({
+                    'predictions': predictions,
+                    'state': state
+                })
+                
+            except Exception as e:
+                print(f"Incremental prediction error: {e}")
+                self._send_error_response(500, f'Internal server error: {str(e)}')
         else:
             self._send_error_response(404, 'Endpoint not found')
     
-    def _send_json_response(self, data, status_code=200):
-        """Send JSON response with CORS headers"""
-        response_data = json.dumps(data, indent=2)
+    def _stream_predictions(self, analyses):
+        """
+        Answer an NDJSON body of /predict requests with one NDJSON line per
+        input line, written as each is analyzed. Only one line is held in
+        memory at a time, so the stream can be arbitrarily long.
+        """
+        # Framing is per HTTP/1.1 chunk; 1.0 clients get a close-delimited body
+        chunked = self.request_version != 'HTTP/1.0'
+        self.send_response(200)
+        self.send_header('Content-Type', NDJSON_CONTENT_TYPE)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        # Decided up front since headers go out before the body is read
+        if not chunked or not self._keep_alive_allowed(body_will_be_read=True):
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        
+        processed = 0
+        failed = 0
+        try:
+            for index, line in enumerate(self._iter_body_lines()):
+                if not line.strip():
+                    continue
+                result = self._stream_line_result(index, line, analyses)
+                if 'error' in result:
+                    failed += 1
+                else:
+                    processed += 1
+                self._write_stream_line(result, chunked)
+            self._write_stream_line({'done': True, 'processed': processed, 'failed': failed}, chunked)
+        except (OSError, ValueError) as e:
+            # Broken framing or a stalled client: the rest of the body cannot be trusted
+            print(f"Prediction stream error: {e}")
+            self.close_connection = True
+            try:
+                self._write_stream_line({'error': f'Stream aborted: {e}'}, chunked)
+            except OSError:
+                return
+        
+        if chunked:
+            try:
+                self.wfile.write(b'0\r\n\r\n')
+            except OSError:
+                self.close_connection = True
+        if not self._body_read:
+            self.close_connection = True
+    
+    def _stream_line_result(self, index, line, analyses):
+        """Analyze one NDJSON request line; errors are reported per line"""
+        try:
+            data = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {'index': index, 'error': 'Invalid JSON data'}
+        if not isinstance(data, dict):
+            return {'index': index, 'error': 'Request line must be a JSON object'}
+        
+        validation_error = validate_prediction_request(data)
+        if validation_error:
+            return {'index': index, 'mac_address': data.get('mac_address'), 'error': validation_error}
+        
+        try:
+            predictions = self.ml_analyzer.analyze_telemetry(
+                mac_address=data['mac_address'],
+                current_data=data['current_data'],
+                historical_data=data['historical_data'],
+                analyses=analyses,
+                use_cache=not self._profile_requested
+            )
+        except Exception as e:
+            print(f"Stream prediction error: {e}")
+            return {'index': index, 'mac_address': data['mac_address'], 'error': f'Analysis failed: {str(e)}'}
+        
+        return {'index': index, 'mac_address': data['mac_address'], 'predictions': predictions}
+    
+    def _write_stream_line(self, data, chunked):
+        line = encode_body(data) + b'\n'
+        if chunked:
+            line = f'{len(line):x}\r\n'.encode('ascii') + line + b'\r\n'
+        self.wfile.write(line)
+    
+    def _iter_body_lines(self, max_line_bytes=MAX_STREAM_LINE_BYTES):
+        """Yield the request body line by line as it arrives, raising ValueError on oversized lines"""
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            blocks = self._iter_chunked_body()
+        else:
+            blocks = self._iter_sized_body(int(self.headers.get('Content-Length') or 0))
+        
+        pending = b''
+        for block in blocks:
+            pending += block
+            *lines, pending = pending.split(b'\n')
+            yield from lines
+            if len(pending) > max_line_bytes:
+                raise ValueError(f'NDJSON line longer than {max_line_bytes} bytes')
+        if pending:
+            yield pending
+        self._body_read = True
+    
+    def _iter_sized_body(self, length):
+        remaining = length
+        while remaining > 0:
+            # read1 returns what has arrived instead of waiting for a full block
+            block = self.rfile.read1(min(remaining, STREAM_READ_SIZE))
+            if not block:
+                raise ValueError('Request body ended before Content-Length')
+            remaining -= len(block)
+            yield block
+    
+    def _iter_chunked_body(self):
+        """Decode a Transfer-Encoding: chunked request body"""
+        while True:
+            size_line = self.rfile.readline(STREAM_READ_SIZE)
+            try:
+                size = int(size_line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise ValueError('Invalid chunk size in request body')
+            
+            if size == 0:
+                # Skip trailer headers up to the terminating blank line
+                while self.rfile.readline(STREAM_READ_SIZE) not in (b'\r\n', b'\n', b''):
+                    pass
+                return
+            
+            remaining = size
+            while remaining > 0:
+                block = self.rfile.read1(min(remaining, STREAM_READ_SIZE))
+                if not block:
+                    raise ValueError('Request body ended inside a chunk')
+                remaining -= len(block)
+                yield block
+            self.rfile.readline(STREAM_READ_SIZE)
+    
+    def _requested_analyses(self, parsed_path):
+        """Analysis names from the analyses query parameter, or None for all"""
+        values = parse_qs(parsed_path.query).get('analyses')
+        if not values:
+            return None
+        
+        names = [name.strip() for value in values for name in value.split(',') if name.strip()]
+        select_analyses(names)
+        return names
+    
+    def _request_content_type(self):
+        """Wire format of the request body; anything but MessagePack is read as JSON"""
+        content_type = self.headers.get_content_type()
+        return content_type if content_type in MSGPACK_CONTENT_TYPES else JSON_CONTENT_TYPE
+    
+    def _response_content_type(self):
+        """Honour Accept if it names a supported format, else answer in the request's format"""
+        for accepted in self.headers.get('Accept', '').split(','):
+            accepted = accepted.split(';')[0].strip().lower()
+            if accepted == JSON_CONTENT_TYPE or (accepted in MSGPACK_CONTENT_TYPES and msgpack is not None):
+                return accepted
+        
+        content_type = self._request_content_type()
+        if content_type in MSGPACK_CONTENT_TYPES and msgpack is not None:
+            return content_type
+        return JSON_CONTENT_TYPE
+    
+    def _read_json_body(self):
+        """Read and decode the JSON or MessagePack request body, sending a 400/415 on failure"""
+        content_length = int(self.headers.get('Content-Length', 0))
+        post_data = self.rfile.read(content_length)
+        self._body_read = True
+        
+        content_type = self._request_content_type()
+        if content_type in MSGPACK_CONTENT_TYPES and msgpack is None:
+            self._send_error_response(415, 'MessagePack support requires the msgpack package')
+            return None
+        
+        try:
+            data = decode_body(post_data, content_type)
+        except ValueError as e:
+            self._send_error_response(400, str(e))
+            return None
+        
+        if not isinstance(data, dict):
+            self._send_error_response(400, 'Request body must be a JSON object')
+            return None
+        
+        return data
+    
+    def _send_json_response(self, data, status_code=200, headers=None):
+        """Send the response in the negotiated format (compact JSON by default) with CORS headers"""
+        if self._profile_requested and isinstance(data, dict):
+            data = {**data, 'profile': self._profile_summary()}
+        content_type = self._response_content_type()
+        response_data = encode_body(data, content_type)
         
         self.send_response(status_code)
-        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(response_data)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', f'Content-Type, Accept, {TENANT_HEADER}')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if not self._keep_alive_allowed():
+            # Also sets close_connection so the handler loop ends after this response
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        
+        self.wfile.write(response_data)
+    
+    def _send_metrics(self):
+        """Send the service metrics in the Prometheus text format"""
+        response_data = self.server.metrics.render(self.server.metric_samples()).encode('utf-8')
+        
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(response_data)))
+        if not self._keep_alive_allowed():
+            self.send_header('Connection', 'close')
         self.end_headers()
         
-        self.wfile.write(response_data.encode('utf-8'))
+        self.wfile.write(response_data)
+    
+    def _profile_summary(self):
+        """The functions that took longest in this request, from its cProfile run"""
+        if self._profiler is None:
+            return {'error': 'Another request is being profiled, retry later'}
+        
+        self._profiler.disable()
+        stats = pstats.Stats(self._profiler)
+        slowest = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return {
+            'total_seconds': round(stats.total_tt, 6),
+            'functions': [
+                {
+                    'function': f'{os.path.basename(filename)}:{line}({name})',
+                    'calls': calls,
+                    'primitive_calls': primitive_calls,
+                    'own_seconds': round(own_time, 6),
+                    'cumulative_seconds': round(cumulative_time, 6)
+                }
+                for (filename, line, name), (primitive_calls, calls, own_time, cumulative_time, _)
+                in slowest[:PROFILE_STATS_LIMIT]
+            ]
+        }
     
-    def _send_error_response(self, status_code, message):
+    def _send_error_response(self, status_code, message, headers=None):
         """Send error response"""
         error_data = {'error': message}
-        self._send_json_response(error_data, status_code)
+        self._send_json_response(error_data, status_code, headers)
+    
+    def log_error(self, format, *args):
+        # An idle keep-alive connection reaching its timeout is routine
+        if format.startswith('Request timed out'):
+            return
+        super().log_error(format, *args)
     
     def log_message(self, format, *args):
         """Custom log message format"""
         print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {format % args}")
 
 
-def run_server(port=5000):
-    """Run the ML service server"""
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, MLRequestHandler)
+class ThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands each connection to a bounded worker thread pool.
+    Connections beyond workers + max_queue are rejected with a fast 503
+    instead of piling up in the listen backlog.
+    """
+    
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS,
+                 max_queue=DEFAULT_MAX_QUEUE, analyzer_backend='auto', analyzer_options=None,
+                 cache_size=DEFAULT_CACHE_SIZE, cache_ttl=DEFAULT_CACHE_TTL,
+                 keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+                 keepalive_max_requests=DEFAULT_KEEPALIVE_MAX_REQUESTS, config_file=None,
+                 config_poll_interval=DEFAULT_CONFIG_POLL_INTERVAL, queue_timeout=DEFAULT_QUEUE_TIMEOUT,
+                 tenant_concurrency=None, bind_and_activate=True):
+        self.workers = max(1, workers)
+        if not keepalive_timeout or keepalive_timeout <= 0:
+            raise ValueError('keepalive_timeout must be positive')
+        self.keepalive_timeout = keepalive_timeout
+        self.keepalive_max_requests = max(0, keepalive_max_requests)
+        self.draining = False
+        self._connections = 0
+        self._connections_lock = threading.Lock()
+        self.analyzer_backend = analyzer_backend
+        self.analyzer_options = analyzer_options or {}
+        self.prediction_cache = PredictionCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.metrics = ServiceMetrics()
+        self.shared_analyzer = SharedAnalyzer(analyzer_backend, self.analyzer_options,
+                                              self.prediction_cache, config_file, self.metrics)
+        self.config_poll_interval = config_poll_interval
+        self.max_queue = max(0, max_queue)
+        self.request_queue_size = max(5, self.max_queue)
+        # Connections that waited longer than this for a worker get a 503; their client has likely given up
+        self.queue_timeout = queue_timeout if queue_timeout and queue_timeout > 0 else None
+        # By default one tenant can hold three quarters of the workers
+        if tenant_concurrency is None:
+            tenant_concurrency = max(1, self.workers - self.workers // 4)
+        self.tenant_limiter = TenantLimiter(tenant_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='ml-worker')
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        super().__init__(server_address, handler_class, bind_and_activate)
+    
+    def get_request(self):
+        # The listener may be non-blocking when shared between processes
+        request, client_address = self.socket.accept()
+        request.setblocking(True)
+        return request, client_address
+    
+    def process_request(self, request, client_address):
+        """Queue the connection on the worker pool, or reject it when full"""
+        if not self._slots.acquire(blocking=False):
+            self._reject_request(request, 'capacity')
+            return
+        
+        with self._connections_lock:
+            self._connections += 1
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address, time.monotonic())
+        except RuntimeError:
+            # Executor is shutting down
+            self._release_slot()
+            self._reject_request(request, 'capacity')
+    
+    def _process_request_worker(self, request, client_address, queued_at):
+        if self.queue_timeout and time.monotonic() - queued_at > self.queue_timeout:
+            try:
+                self._reject_request(request, 'queue_timeout')
+            finally:
+                self._release_slot()
+            return
+        
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._release_slot()
+    
+    def _release_slot(self):
+        with self._connections_lock:
+            self._connections -= 1
+        self._slots.release()
+    
+    def metric_samples(self):
+        """Connection and cache figures added to GET /metrics"""
+        samples = [('ml_open_connections', 'gauge', 'Connections being served or waiting for a worker',
+                    self._connections)]
+        if self.prediction_cache is not None:
+            stats = self.prediction_cache.stats()
+            samples += [
+                ('ml_prediction_cache_hits_total', 'counter', 'Predictions answered from the cache',
+                 stats['hits']),
+                ('ml_prediction_cache_misses_total', 'counter', 'Predictions not found in the cache',
+                 stats['misses']),
+                ('ml_prediction_cache_entries', 'gauge', 'Predictions held in the cache', stats['entries'])
+            ]
+        return samples
+    
+    def has_waiting_connections(self):
+        """True when accepted connections are queued behind busy workers"""
+        return self._connections > self.workers
     
+    def _reject_request(self, request, reason):
+        """Send a minimal 503 without reading the request"""
+        self.metrics.request_rejected(reason)
+        body = b'{"error": "ML service is at capacity, retry later"}'
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Content-Type: application/json\r\n'
+                b'Retry-After: ' + str(RETRY_AFTER_SECONDS).encode('ascii') + b'\r\n'
+                b'Connection: close\r\n'
+                b'Content-Length: ' + str(len(body)).encode('ascii') + b'\r\n\r\n' + body
+            )
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+    
+    def drain(self):
+        """Wait for queued and in-flight requests to finish"""
+        # Keep-alive connections close after their current request, idle ones right away
+        self.draining = True
+        self._executor.shutdown(wait=True)
+    
+    def server_close(self):
+        super().server_close()
+        self.drain()
+
+
+def _print_banner(port, workers, max_queue, processes=1, backend_name='SimplifiedMLAnalyzer',
+                  stateful=False):
     print("🧠 Standalone ML Analysis Service")
     print("=" * 50)
     print("🔬 Statistical predictions for IT assets")
     print("📊 Features: Storage forecasting, Memory leak detection, CPU analysis")
     print("🚀 No external dependencies required!")
     print(f"🌐 Server running on http://localhost:{port}")
+    if processes > 1:
+        print(f"⚙️  Worker processes: {processes}")
+    print(f"🧵 Worker threads: {workers}, request queue limit: {max_queue}")
+    print(f"🧮 Analyzer backend: {backend_name}")
     print("\n📡 Available endpoints:")
     print("   • GET  /health - Health check")
     print("   • GET  /model_info - Model information") 
     print("   • POST /predict - Main prediction endpoint")
+    print("   • POST /predict/batch - Batch prediction for many assets")
+    print("   • POST /predict/stream - NDJSON streaming predictions")
+    print("   • POST /fleet/analyze - Fleet-wide percentiles, exhaustion and outliers")
+    print("   • GET  /stats - Prediction cache, tenant and state counters")
+    print("   • GET  /metrics - Prometheus metrics")
+    if stateful:
+        print("   • POST /predict/incremental - Stateful prediction from the newest point")
+        print("   • GET  /state - Incremental state statistics")
     print("\n🔄 Ready to receive requests from Node.js backend")
     print("=" * 50)
+
+
+def _serve_until_stopped(httpd):
+    """Serve until SIGINT/SIGTERM, then drain in-flight requests"""
+    # shutdown() must run off the serving thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=httpd.shutdown).start())
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    if hasattr(signal, 'SIGHUP'):
+        # SIGHUP reloads the config file immediately instead of on the next poll
+        signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(
+            target=httpd.shared_analyzer.reload_if_changed, kwargs={'force': True}).start())
+    stop_watching = httpd.shared_analyzer.watch(httpd.config_poll_interval)
     
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n🛑 Shutting down ML service...")
-        httpd.shutdown()
+        pass
+    finally:
+        stop_watching.set()
+        httpd.server_close()
+
+
+def _start_state_snapshots(incremental_analyzer, state_file, interval):
+    """Periodically save incremental state; returns an Event that stops the loop"""
+    stop_event = threading.Event()
+    
+    def snapshot_loop():
+        while not stop_event.wait(interval):
+            try:
+                incremental_analyzer.save_snapshot(state_file)
+            except OSError as e:
+                print(f"State snapshot error: {e}")
+    
+    threading.Thread(target=snapshot_loop, name='state-snapshots', daemon=True).start()
+    return stop_event
+
+
+def _check_analyzer_backend(server_options):
+    """Fail at startup rather than on the first request if the backend or config is unusable"""
+    shared_analyzer = SharedAnalyzer(server_options.get('analyzer_backend', 'auto'),
+                                     server_options.get('analyzer_options'),
+                                     config_file=server_options.get('config_file'))
+    return type(shared_analyzer.current).__name__
+
+
+def run_server(port=5000, state_options=None, **server_options):
+    """
+    Run the ML service server. server_options are passed to
+    ThreadPoolHTTPServer (workers, max_queue, analyzer_backend, ...).
+    """
+    server_address = ('', port)
+    httpd = ThreadPoolHTTPServer(server_address, MLRequestHandler, **server_options)
+    backend_name = type(httpd.shared_analyzer.current).__name__
+    
+    incremental_analyzer = None
+    stop_snapshots = None
+    state_file = None
+    if state_options is not None:
+        state_options = dict(state_options)
+        state_file = state_options.pop('state_file', None)
+        snapshot_interval = state_options.pop('snapshot_interval', DEFAULT_SNAPSHOT_INTERVAL)
+        # State accumulated under one set of thresholds is not rebuilt on reload,
+        # so the incremental analyzer keeps the settings it started with
+        analyzer_options = {key: value for key, value in httpd.shared_analyzer.settings.items()
+                            if key != 'backend'}
+        try:
+            incremental_analyzer = IncrementalMLAnalyzer(**analyzer_options, **state_options,
+                                                         metrics=httpd.metrics)
+        except ValueError as e:
+            # e.g. a bucket_minutes from the --config file
+            httpd.server_close()
+            raise SystemExit(f"❌ Cannot start stateful mode: {e}")
+        httpd.incremental_analyzer = incremental_analyzer
+        
+        if state_file and os.path.exists(state_file):
+            try:
+                restored = incremental_analyzer.load_snapshot(state_file)
+                print(f"♻️  Restored incremental state for {restored} assets from {state_file}")
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                # A damaged snapshot must not keep the service from starting
+                print(f"⚠️  Could not restore state from {state_file}: {e}")
+        if state_file and snapshot_interval > 0:
+            stop_snapshots = _start_state_snapshots(incremental_analyzer, state_file, snapshot_interval)
+    
+    _print_banner(port, httpd.workers, httpd.max_queue, backend_name=backend_name,
+                  stateful=incremental_analyzer is not None)
+    _serve_until_stopped(httpd)
+    
+    if stop_snapshots is not None:
+        stop_snapshots.set()
+    if incremental_analyzer is not None and state_file:
+        saved = incremental_analyzer.save_snapshot(state_file)
+        print(f"💾 Saved incremental state for {saved} assets to {state_file}")
+    print("\n🛑 ML service stopped after draining in-flight requests")
+
+
+def _run_worker_process(listener, server_options):
+    """Serve requests from a listening socket inherited from the parent"""
+    httpd = ThreadPoolHTTPServer(listener.getsockname(), MLRequestHandler,
+                                 bind_and_activate=False, **server_options)
+    httpd.socket.close()
+    httpd.socket = listener
+    httpd.server_address = listener.getsockname()
+    _serve_until_stopped(httpd)
+
+
+def run_prefork_server(port=5000, processes=None, **server_options):
+    """
+    Run the ML service across several processes sharing one listening socket.
+    Analysis is CPU-bound pure Python, so threads alone stay on one core.
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or not hasattr(os, 'fork'):
+        if processes > 1:
+            print("⚠️  Multi-process mode needs os.fork, falling back to a single process")
+        return run_server(port, **server_options)
+    
+    backend_name = _check_analyzer_backend(server_options)
+    workers = server_options.get('workers', DEFAULT_WORKERS)
+    max_queue = server_options.get('max_queue', DEFAULT_MAX_QUEUE)
+    listener = socket.create_server(('', port), backlog=max(5, max_queue * processes))
+    # Non-blocking so an idle worker losing the accept race goes back to select()
+    listener.setblocking(False)
+    
+    children = {}
+    stopping = False
+    
+    def spawn_worker():
+        pid = os.fork()
+        if pid == 0:
+            # The parent's handlers would make a starting worker signal its siblings
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            # A worker still starting up reads the config file anyway
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            exit_code = 0
+            try:
+                _run_worker_process(listener, server_options)
+            except Exception as e:
+                print(f"ML worker {os.getpid()} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        children[pid] = time.time()
+    
+    def stop_workers(signum, frame):
+        nonlocal stopping
+        stopping = True
+        signal_workers(signal.SIGTERM)
+    
+    def signal_workers(signum, frame=None):
+        for pid in list(children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    _print_banner(port, workers, max_queue, processes, backend_name)
+    for _ in range(processes):
+        spawn_worker()
+    
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    signal.signal(signal.SIGHUP, signal_workers)
+    
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started_at = children.pop(pid, None)
+        if started_at is None or stopping:
+            continue
+        
+        print(f"⚠️  ML worker {pid} exited with status {status}, restarting")
+        # Avoid a tight respawn loop when workers die immediately
+        if time.time() - started_at < 1:
+            time.sleep(1)
+        if not stopping:
+            spawn_worker()
+    
+    listener.close()
+    print("\n🛑 ML service stopped after draining in-flight requests")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Standalone ML Analysis Service')
+    parser.add_argument('--port', type=int, default=5000,
+                        help='Port to listen on (default: 5000)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Number of worker processes sharing the port; 0 uses one per CPU '
+                             '(default: 1)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of request worker threads per process (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help='Requests allowed to wait for a worker before new ones get 503 '
+                             f'(default: {DEFAULT_MAX_QUEUE})')
+    parser.add_argument('--queue-timeout', type=float, default=DEFAULT_QUEUE_TIMEOUT,
+                        help='Seconds a connection may wait for a worker before it gets 503, '
+                             f'0 waits indefinitely (default: {DEFAULT_QUEUE_TIMEOUT})')
+    parser.add_argument('--tenant-concurrency', type=int,
+                        help=f'POST requests one tenant ({TENANT_HEADER} header) may have in progress '
+                             'per process before it gets 503, 0 for no limit '
+                             '(default: three quarters of --workers)')
+    parser.add_argument('--backend', choices=['auto', 'python', 'numpy'], default='auto',
+                        help='Analyzer implementation; auto uses NumPy when installed (default: auto)')
+    parser.add_argument('--anomaly-window', type=int, default=DEFAULT_ANOMALY_WINDOW,
+                        help='Recent points checked for recent_anomaly_count '
+                             f'(default: {DEFAULT_ANOMALY_WINDOW})')
+    parser.add_argument('--bucket-minutes', type=int,
+                        help='Fit trends against timestamps, averaging history into buckets of this '
+                             'many minutes for the fit only; 0 uses the sample index '
+                             f'(default: {DEFAULT_BUCKET_MINUTES}, 0 with --stateful)')
+    parser.add_argument('--baselines',
+                        help='Baseline store written by train_baselines.py; assets found in it get '
+                             'anomaly scores against their learned hour-of-week baseline')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='Prediction results kept in the LRU cache, 0 disables caching '
+                             f'(default: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_CACHE_TTL,
+                        help=f'Seconds a cached prediction stays valid (default: {DEFAULT_CACHE_TTL})')
+    parser.add_argument('--keepalive-timeout', type=float, default=DEFAULT_KEEPALIVE_TIMEOUT,
+                        help='Seconds an idle keep-alive connection stays open, closed sooner when '
+                             f'connections are waiting for a worker (default: {DEFAULT_KEEPALIVE_TIMEOUT})')
+    parser.add_argument('--keepalive-max-requests', type=int, default=DEFAULT_KEEPALIVE_MAX_REQUESTS,
+                        help='Requests served on one connection before it is closed, 0 for no limit '
+                             f'(default: {DEFAULT_KEEPALIVE_MAX_REQUESTS})')
+    parser.add_argument('--config',
+                        help='JSON file overriding analyzer settings (see README); '
+                             'reloaded when it changes or on SIGHUP')
+    parser.add_argument('--config-poll-interval', type=float, default=DEFAULT_CONFIG_POLL_INTERVAL,
+                        help='Seconds between config file change checks, 0 reloads only on SIGHUP '
+                             f'(default: {DEFAULT_CONFIG_POLL_INTERVAL})')
+    parser.add_argument('--stateful', action='store_true',
+                        help='Keep per-asset running statistics and enable POST /predict/incremental '
+                             '(single process only)')
+    parser.add_argument('--state-file',
+                        help='Snapshot file used to restore and persist incremental state')
+    parser.add_argument('--state-history', type=int, default=DEFAULT_STATE_HISTORY,
+                        help=f'Points kept per asset in stateful mode (default: {DEFAULT_STATE_HISTORY})')
+    parser.add_argument('--state-max-assets', type=int, default=DEFAULT_STATE_MAX_ASSETS,
+                        help='Assets kept in stateful mode before least recently used ones are evicted '
+                             f'(default: {DEFAULT_STATE_MAX_ASSETS})')
+    parser.add_argument('--snapshot-interval', type=int, default=DEFAULT_SNAPSHOT_INTERVAL,
+                        help='Seconds between state snapshots, 0 saves only on shutdown '
+                             f'(default: {DEFAULT_SNAPSHOT_INTERVAL})')
+    
+    args = parser.parse_args(argv)
+    if args.stateful and args.processes != 1:
+        parser.error('--stateful keeps state in memory and requires --processes 1')
+    if args.bucket_minutes is None:
+        args.bucket_minutes = 0 if args.stateful else DEFAULT_BUCKET_MINUTES
+    elif args.stateful and args.bucket_minutes:
+        # The running sums have no time axis, so /predict and /predict/incremental would disagree
+        parser.error('--stateful fits trends against the sample index and requires --bucket-minutes 0')
+    if args.keepalive_timeout <= 0:
+        # Idle connections would hold their worker thread forever
+        parser.error('--keepalive-timeout must be greater than 0')
+    return args
 
 
 if __name__ == '__main__':
-    run_server()
+    args = parse_args()
+    server_options = {
+        'workers': args.workers,
+        'max_queue': args.max_queue,
+        'queue_timeout': args.queue_timeout,
+        'tenant_concurrency': args.tenant_concurrency,
+        'analyzer_backend': args.backend,
+        'analyzer_options': {
+            'anomaly_window': args.anomaly_window,
+            'bucket_minutes': args.bucket_minutes,
+            'baselines': args.baselines
+        },
+        'cache_size': args.cache_size,
+        'cache_ttl': args.cache_ttl,
+        'keepalive_timeout': args.keepalive_timeout,
+        'keepalive_max_requests': args.keepalive_max_requests,
+        'config_file': args.config,
+        'config_poll_interval': args.config_poll_interval
+    }
+    if args.processes == 1:
+        state_options = None
+        if args.stateful:
+            state_options = {
+                'history_limit': args.state_history,
+                'max_assets': args.state_max_assets,
+                'state_file': args.state_file,
+                'snapshot_interval': args.snapshot_interval
+            }
+        run_server(port=args.port, state_options=state_options, **server_options)
+    else:
+        run_prefork_server(port=args.port, processes=args.processes or None, **server_options)
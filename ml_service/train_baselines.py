@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Learn per-asset baselines offline from historical telemetry exports.
+Each asset gets per-metric quantiles and an hour-of-week profile, written
+to a memory-mapped store the ML service loads with --baselines.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standalone_ml_service import BaselineStore, columns_to_rows, learn_baseline
+
+
+def read_export(path):
+    """
+    Asset records from one export file: a JSON list, an object with an
+    'assets' list (the /predict/batch body), a single telemetry document,
+    or NDJSON with one record per line.
+    """
+    with open(path) as f:
+        text = f.read()
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    if isinstance(data, dict):
+        return data['assets'] if isinstance(data.get('assets'), list) else [data]
+    return data
+
+
+def collect_histories(paths):
+    """Telemetry points per MAC address across all export files"""
+    histories = {}
+    skipped = 0
+    
+    for path in paths:
+        for record in read_export(path):
+            if not isinstance(record, dict) or not record.get('mac_address'):
+                skipped += 1
+                continue
+            
+            points = record.get('historical_data') or []
+            if isinstance(points, dict):
+                points = columns_to_rows(points)
+            if isinstance(record.get('current_data'), dict):
+                points = points + [record['current_data']]
+            histories.setdefault(str(record['mac_address']), []).extend(
+                point for point in points if isinstance(point, dict)
+            )
+    
+    return histories, skipped
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Learn per-asset baselines for the ML service')
+    parser.add_argument('exports', nargs='+',
+                        help='JSON or NDJSON telemetry exports with mac_address and historical_data')
+    parser.add_argument('--output', required=True,
+                        help='Baseline store to write (pass it to the service with --baselines)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📚 Learning per-asset baselines")
+    
+    try:
+        histories, skipped = collect_histories(args.exports)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read exports: {e}")
+        return 1
+    
+    baselines = {mac_address: learn_baseline(points) for mac_address, points in histories.items()}
+    stored = BaselineStore.write(args.output, baselines)
+    
+    print(f"✓ {stored} of {len(histories)} assets have enough history for a baseline")
+    if skipped:
+        print(f"⚠️  Skipped {skipped} records without a mac_address")
+    print(f"💾 Baselines written to {args.output} ({os.path.getsize(args.output)} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('hardware.py', '.'), ('software.py', '.'), ('telemetry.py', '.'), ('utils.py', '.'), ('patch.py', '.'), ('wi-blu.py', '.'), ('latest_version.py', '.'), ('compatibility_test.py', '.'), ('test_mac.py', '.'), ('generate_test_data.py', '.')]
+datas = [('hardware.py', '.'), ('software.py', '.'), ('telemetry.py', '.'), ('utils.py', '.'), ('transport.py', '.'), ('patch.py', '.'), ('wi-blu.py', '.'), ('latest_version.py', '.'), ('compatibility_test.py', '.'), ('test_mac.py', '.'), ('generate_test_data.py', '.')]
 binaries = []
 hiddenimports = ['schedule', 'schedule.job', 'schedule.every', 'requests', 'psutil', 'GPUtil']
 tmp_ret = collect_all('schedule')
@@ -47,6 +47,7 @@ def build_executable():
             "--add-data", "software.py;.",
             "--add-data", "telemetry.py;.",
             "--add-data", "utils.py;.",
+            "--add-data", "transport.py;.",
             "--add-data", "patch.py;.",
             "--add-data", "wi-blu.py;.",
             "--add-data", "latest_version.py;.",
@@ -93,6 +94,7 @@ def build_background_executable():
             "--add-data", "software.py;.",
             "--add-data", "telemetry.py;.",
             "--add-data", "utils.py;.",
+            "--add-data", "transport.py;.",
             "--add-data", "patch.py;.",
             "--add-data", "wi-blu.py;.",
             "--add-data", "latest_version.py;.",
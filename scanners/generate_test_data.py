@@ -4,7 +4,6 @@ Generate test telemetry data to demonstrate ML predictions
 This script simulates various system scenarios to test the ML algorithms
 """
 
-import requests
 import time
 import random
 import math
@@ -99,6 +98,9 @@ def simulate_degrading_performance(day_offset=0):
 
 def send_telemetry_data(data):
     """Send telemetry data to the API"""
+    # Imported here so the scenario generators work without requests installed
+    import requests
+    
     try:
         response = requests.post(API_URL, json=data, timeout=10)
         if response.status_code == 200:
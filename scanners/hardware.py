@@ -5,8 +5,13 @@ from datetime import datetime
 import re
 import os
 import socket
+import sys
 import uuid
-import requests
+import hashlib
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import transport
 
 # Import shared utilities
 try:
@@ -27,6 +32,50 @@ TENANT_ID = os.getenv('TENANT_ID', 'default')
 API_TOKEN = os.getenv('API_TOKEN', '')
 API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:3000/api')
 
+# Collector scheduling - collectors run concurrently unless HARDWARE_SCAN_PARALLEL=0
+HARDWARE_SCAN_PARALLEL = os.getenv('HARDWARE_SCAN_PARALLEL', '1') != '0'
+COLLECTOR_TIMEOUT = float(os.getenv('HARDWARE_COLLECTOR_TIMEOUT', '30'))
+SCAN_DEADLINE = float(os.getenv('HARDWARE_SCAN_DEADLINE', '60'))
+
+
+def get_data_dir():
+    """
+    Directory for the scanner's own data files. A PyInstaller onefile build
+    runs from a temporary folder that is deleted on exit, so frozen builds use
+    the executable's folder, or a per-user folder when that is not writable.
+    """
+    if not getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(__file__))
+    
+    exe_dir = os.path.dirname(os.path.abspath(sys.executable))
+    if os.access(exe_dir, os.W_OK):
+        return exe_dir
+    
+    base_dir = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    data_dir = os.path.join(base_dir, 'ITAMScanner')
+    try:
+        os.makedirs(data_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Could not create scanner data directory {data_dir}: {e}")
+    return data_dir
+
+
+DATA_DIR = get_data_dir()
+
+# Static hardware cache - set HARDWARE_CACHE_FILE to an empty value to always re-probe
+HARDWARE_CACHE_FILE = os.getenv('HARDWARE_CACHE_FILE', os.path.join(DATA_DIR, 'hardware_cache.json'))
+HARDWARE_CACHE_TTL = float(os.getenv('HARDWARE_CACHE_TTL_HOURS', '24')) * 3600
+HARDWARE_CACHE_VERSION = 1
+# Block devices that come and go with snaps, containers and volume managers
+VIRTUAL_DISK_PREFIXES = ('loop', 'ram', 'zram', 'nbd', 'dm-')
+
+# Last hardware document the server acknowledged, the base for delta uploads
+HARDWARE_SNAPSHOT_FILE = os.getenv('HARDWARE_SNAPSHOT_FILE', os.path.join(DATA_DIR, 'hardware_snapshot.json'))
+# Local scan diagnostics that the server does not store
+SNAPSHOT_EXCLUDED_KEYS = ('scan_info',)
+# Sections the server accepts in a delta, everything else only travels in full uploads
+DELTA_SECTIONS = ('system', 'cpu', 'memory', 'storage', 'network', 'graphics', 'motherboard', 'power_thermal')
+
 # Optional imports for enhanced features
 try:
     import psutil
@@ -41,37 +90,73 @@ try:
 except ImportError:
     GPUTIL_AVAILABLE = False
 
+# Suffix of the platform-specific detail methods, e.g. _get_cpu_info_macos
+PLATFORM_SUFFIXES = {'windows': 'windows', 'linux': 'linux', 'darwin': 'macos'}
+
+# WMI classes read by the Windows collectors and the properties each parser uses.
+# All of them are fetched by a single PowerShell process per scan.
+WINDOWS_CIM_CLASSES = {
+    'Win32_Processor': 'Name, Manufacturer, Family, Model, Stepping, MaxClockSpeed, L2CacheSize, L3CacheSize, NumberOfCores, NumberOfLogicalProcessors',
+    'Win32_PhysicalMemory': 'Capacity, Speed, MemoryType, FormFactor, Manufacturer',
+    'Win32_DiskDrive': 'Model, Size, MediaType, InterfaceType',
+    'Win32_VideoController': 'Name, AdapterRAM, DriverVersion, VideoProcessor',
+    'Win32_BaseBoard': 'Manufacturer, Product, Version, SerialNumber',
+    'Win32_BIOS': 'Manufacturer, SMBIOSBIOSVersion, ReleaseDate'
+}
+
 
 class HardwareDetector:
-    def __init__(self):
+    def __init__(self, parallel=HARDWARE_SCAN_PARALLEL, collector_timeout=COLLECTOR_TIMEOUT,
+                 scan_deadline=SCAN_DEADLINE, cache_file=HARDWARE_CACHE_FILE, cache_ttl=HARDWARE_CACHE_TTL):
         self.system = platform.system().lower()
         self.hardware_info = {}
+        self.parallel = parallel
+        self.collector_timeout = collector_timeout
+        self.scan_deadline = scan_deadline
+        self._cim_data = None
+        self._cim_lock = threading.Lock()
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self._static_cache = {}
+        self._static_probed = {}
+        self._static_created = None
+        # Static probe results of the scan that started the collector on this thread
+        self._scan_state = threading.local()
+        
+        # Independent collectors, keyed by their section in hardware_info
+        self.collectors = [
+            ('system', self._get_system_info),
+            ('cpu', self._get_cpu_info),
+            ('memory', self._get_memory_info),
+            ('storage', self._get_storage_info),
+            ('network', self._get_network_hardware),
+            ('graphics', self._get_graphics_info),
+            ('motherboard', self._get_motherboard_info),
+            ('power_thermal', self._get_power_thermal_info)
+        ]
         
     def get_comprehensive_hardware_info(self):
         """Get complete hardware information."""
-        # Basic system info
-        self.hardware_info['system'] = self._get_system_info()
-        
-        # CPU information
-        self.hardware_info['cpu'] = self._get_cpu_info()
-        
-        # Memory information
-        self.hardware_info['memory'] = self._get_memory_info()
+        started = time.monotonic()
+        self._cim_data = None
+        fingerprint, cache_status = self._load_static_cache()
         
-        # Storage information
-        self.hardware_info['storage'] = self._get_storage_info()
-        
-        # Network hardware
-        self.hardware_info['network'] = self._get_network_hardware()
+        if self.parallel:
+            results, scan_info = self._collect_parallel()
+        else:
+            results, scan_info = self._collect_sequential()
         
-        # Graphics information
-        self.hardware_info['graphics'] = self._get_graphics_info()
+        # Sections whose collector failed or timed out are left out rather than sent empty,
+        # so the upload keeps the last known values for them
+        self.hardware_info = {key: results[key] for key, _ in self.collectors if key in results}
         
-        # Motherboard and BIOS
-        self.hardware_info['motherboard'] = self._get_motherboard_info()
+        # Only a complete scan may refresh the cache, so a timed-out probe is retried next time
+        if self.cache_file and self._static_probed and not scan_info['failed'] and not scan_info['timed_out']:
+            self._save_static_cache(fingerprint)
         
-        # Power and thermal
-        self.hardware_info['power_thermal'] = self._get_power_thermal_info()
+        scan_info['static_cache'] = cache_status
+        scan_info['duration_seconds'] = round(time.monotonic() - started, 3)
+        self.hardware_info['scan_info'] = scan_info
         
         # Add tenant information at root level for backend compatibility
         self.hardware_info['tenant_id'] = TENANT_ID
@@ -87,6 +172,246 @@ class HardwareDetector:
         
         return self.hardware_info
     
+    def _collect_sequential(self):
+        """Run the collectors one after another."""
+        results = {}
+        scan_info = {'mode': 'sequential', 'collector_seconds': {}, 'failed': [], 'timed_out': []}
+        
+        for key, collector in self.collectors:
+            started = time.monotonic()
+            try:
+                results[key] = self._run_collector(collector, self._static_probed)
+            except Exception as e:
+                print(f"Hardware collector {key} failed: {e}")
+                scan_info['failed'].append(key)
+            scan_info['collector_seconds'][key] = round(time.monotonic() - started, 3)
+        
+        return results, scan_info
+    
+    def _collect_parallel(self):
+        """
+        Run the collectors in a thread pool. A collector that exceeds its own
+        timeout or the scan deadline is reported as timed out and has no
+        result, so the sections that did finish are still returned.
+        """
+        results = {}
+        scan_info = {'mode': 'parallel', 'collector_seconds': {}, 'failed': [], 'timed_out': []}
+        started = time.monotonic()
+        deadline = started + self.scan_deadline
+        
+        executor = ThreadPoolExecutor(max_workers=len(self.collectors), thread_name_prefix='hardware-collector')
+        futures = {
+            executor.submit(self._run_collector, collector, self._static_probed): key
+            for key, collector in self.collectors
+        }
+        pending = set(futures)
+        
+        try:
+            while pending:
+                now = time.monotonic()
+                # Every collector started together, so its own timeout is measured from the scan start
+                remaining = min(deadline, started + self.collector_timeout) - now
+                if remaining <= 0:
+                    break
+                
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = futures[future]
+                    scan_info['collector_seconds'][key] = round(time.monotonic() - started, 3)
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        print(f"Hardware collector {key} failed: {e}")
+                        scan_info['failed'].append(key)
+        finally:
+            # Do not block on stragglers; their subprocesses are bounded by COLLECTOR_TIMEOUT
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future in pending:
+            key = futures[future]
+            print(f"Hardware collector {key} timed out")
+            scan_info['timed_out'].append(key)
+        
+        return results, scan_info
+    
+    def _run_collector(self, collector, probed):
+        """
+        Run a collector, recording its static probes into the given scan's
+        dict. A collector that times out keeps running after its scan is
+        over and must not write into the next scan's results.
+        """
+        self._scan_state.probed = probed
+        try:
+            return collector()
+        finally:
+            self._scan_state.probed = None
+    
+    def _static_fingerprint(self):
+        """
+        Cheap signals that change when the hardware might have: the PCI device
+        list and the physical disk and network interface counts. Boot time and
+        virtual block devices change without any hardware change, so they are
+        left out.
+        """
+        fingerprint = {'platform': self.system}
+        
+        if PSUTIL_AVAILABLE:
+            try:
+                disks = psutil.disk_io_counters(perdisk=True) or {}
+                fingerprint['disk_count'] = sum(1 for name in disks if not name.startswith(VIRTUAL_DISK_PREFIXES))
+                fingerprint['nic_count'] = len(psutil.net_if_stats())
+            except Exception:
+                pass
+        
+        devices = []
+        try:
+            if self.system == 'linux':
+                for bus in ('/sys/bus/pci/devices', '/sys/block'):
+                    if os.path.isdir(bus):
+                        devices.extend(f"{bus}/{name}" for name in os.listdir(bus)
+                                       if not name.startswith(VIRTUAL_DISK_PREFIXES))
+            elif self.system == 'windows':
+                import winreg
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r'SYSTEM\CurrentControlSet\Enum\PCI') as key:
+                    index = 0
+                    while True:
+                        try:
+                            devices.append(winreg.EnumKey(key, index))
+                        except OSError:
+                            break
+                        index += 1
+        except Exception:
+            pass
+        
+        if devices:
+            fingerprint['devices'] = hashlib.sha1('\n'.join(sorted(devices)).encode()).hexdigest()
+        
+        return fingerprint
+    
+    def _load_static_cache(self):
+        """
+        Load the cached static sections if they are still valid for this machine.
+        Returns the current fingerprint and whether the cache was used.
+        """
+        self._static_cache = {}
+        self._static_probed = {}
+        self._static_created = time.time()
+        
+        if not self.cache_file:
+            return None, 'disabled'
+        
+        fingerprint = self._static_fingerprint()
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return fingerprint, 'miss'
+        except Exception as e:
+            print(f"Ignoring unreadable hardware cache: {e}")
+            return fingerprint, 'miss'
+        
+        if cached.get('version') != HARDWARE_CACHE_VERSION or cached.get('fingerprint') != fingerprint:
+            return fingerprint, 'changed'
+        if time.time() - cached.get('created_at', 0) > self.cache_ttl:
+            return fingerprint, 'expired'
+        
+        self._static_cache = cached.get('sections', {})
+        self._static_created = cached['created_at']
+        return fingerprint, 'hit'
+    
+    def _save_static_cache(self, fingerprint):
+        """Write the static sections atomically so a crashed scan never leaves half a file."""
+        sections = dict(self._static_cache)
+        # Empty results usually mean the probe failed, so keep retrying them
+        sections.update({section: details for section, details in self._static_probed.items() if details})
+        
+        cached = {
+            'version': HARDWARE_CACHE_VERSION,
+            'fingerprint': fingerprint,
+            'created_at': self._static_created,
+            'sections': sections
+        }
+        
+        temp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(cached, f)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Could not write hardware cache: {e}")
+    
+    def _static_details(self, section, default):
+        """
+        Platform-specific details for a section. These come from slow probes of
+        hardware that rarely changes, so they are served from the static cache
+        when it is valid and recorded for it otherwise.
+        """
+        if section in self._static_cache:
+            return self._static_cache[section]
+        
+        suffix = PLATFORM_SUFFIXES.get(self.system)
+        if not suffix:
+            return default
+        
+        details = getattr(self, f'_get_{section}_info_{suffix}')()
+        probed = getattr(self._scan_state, 'probed', None)
+        # Called outside a scan's collectors, e.g. on its own
+        if probed is None:
+            probed = self._static_probed
+        probed[section] = details
+        return details
+    
+    def _run_cim_script(self, classes):
+        """Fetch the given WMI classes with one PowerShell process, keyed by class name."""
+        entries = '\n'.join(
+            f"'{name}' = @(Get-WmiObject -Class {name} | Select-Object {WINDOWS_CIM_CLASSES[name]})"
+            for name in classes
+        )
+        cmd = f"@{{\n{entries}\n}} | ConvertTo-Json -Depth 4 -Compress"
+        result = subprocess.run(['powershell', '-NoProfile', '-Command', cmd], 
+                              capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
+        
+        if result.returncode == 0 and result.stdout.strip():
+            return json.loads(result.stdout)
+        return {}
+    
+    def _query_cim(self, class_name):
+        """
+        Instances of a WMI class, shaped like ConvertTo-Json output for that class
+        alone: a dict for one instance, a list for several, None for none.
+        The first caller in a scan runs the batched script; the others reuse it.
+        """
+        with self._cim_lock:
+            if self._cim_data is None:
+                try:
+                    self._cim_data = self._run_cim_script(WINDOWS_CIM_CLASSES)
+                except Exception as e:
+                    print(f"Batched WMI query failed: {e}")
+                    self._cim_data = {}
+        
+        if not self._cim_data:
+            # The batch failed or timed out, and a PowerShell per class would fail the same way
+            return None
+        
+        data = self._cim_data.get(class_name)
+        if class_name not in self._cim_data:
+            # Batch skipped this class, query it on its own
+            try:
+                data = self._run_cim_script([class_name]).get(class_name)
+            except Exception as e:
+                print(f"WMI query for {class_name} failed: {e}")
+                return None
+        
+        # Windows PowerShell can wrap arrays as {"value": [...], "Count": n}
+        if isinstance(data, dict) and 'value' in data and 'Count' in data:
+            data = data['value']
+        if isinstance(data, list):
+            if not data:
+                return None
+            if len(data) == 1:
+                return data[0]
+        return data
+    
     def _get_system_info(self):
         """Get basic system information."""
         system_info = {
@@ -137,12 +462,7 @@ class HardwareDetector:
                 pass
         
         # Platform-specific CPU details
-        if self.system == 'windows':
-            cpu_info.update(self._get_cpu_info_windows())
-        elif self.system == 'linux':
-            cpu_info.update(self._get_cpu_info_linux())
-        elif self.system == 'darwin':
-            cpu_info.update(self._get_cpu_info_macos())
+        cpu_info.update(self._static_details('cpu', {}))
         
         return cpu_info
     
@@ -150,17 +470,8 @@ class HardwareDetector:
         """Get Windows-specific CPU information."""
         cpu_details = {}
         try:
-            cmd = '''
-            Get-WmiObject -Class Win32_Processor | 
-            Select-Object Name, Manufacturer, Family, Model, Stepping, MaxClockSpeed, 
-            L2CacheSize, L3CacheSize, NumberOfCores, NumberOfLogicalProcessors | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_Processor')
+            if data:
                 if isinstance(data, list):
                     data = data[0]
                 
@@ -211,7 +522,7 @@ class HardwareDetector:
         cpu_details = {}
         try:
             result = subprocess.run(['sysctl', '-n', 'machdep.cpu.brand_string'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 cpu_details['name'] = result.stdout.strip()
             
@@ -226,7 +537,7 @@ class HardwareDetector:
             for key, command in cpu_commands.items():
                 try:
                     result = subprocess.run(['sysctl', '-n', command], 
-                                          capture_output=True, text=True)
+                                          capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
                     if result.returncode == 0:
                         cpu_details[key] = result.stdout.strip()
                 except:
@@ -257,12 +568,7 @@ class HardwareDetector:
                 'percentage': f"{mem.percent}%"
             })
         
-        if self.system == 'windows':
-            memory_info.update(self._get_memory_info_windows())
-        elif self.system == 'linux':
-            memory_info.update(self._get_memory_info_linux())
-        elif self.system == 'darwin':
-            memory_info.update(self._get_memory_info_macos())
+        memory_info.update(self._static_details('memory', {}))
         
         return memory_info
     
@@ -270,16 +576,8 @@ class HardwareDetector:
         """Get Windows-specific memory information."""
         memory_details = {}
         try:
-            cmd = '''
-            Get-WmiObject -Class Win32_PhysicalMemory | 
-            Select-Object Capacity, Speed, MemoryType, FormFactor, Manufacturer | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_PhysicalMemory')
+            if data:
                 if not isinstance(data, list):
                     data = [data]
                 
@@ -324,7 +622,7 @@ class HardwareDetector:
             
             try:
                 result = subprocess.run(['dmidecode', '-t', 'memory'], 
-                                      capture_output=True, text=True)
+                                      capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
                 if result.returncode == 0:
                     slots = []
                     current_slot = {}
@@ -358,7 +656,7 @@ class HardwareDetector:
         memory_details = {}
         try:
             result = subprocess.run(['system_profiler', 'SPMemoryDataType'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 slots = []
                 lines = result.stdout.split('\n')
@@ -395,12 +693,7 @@ class HardwareDetector:
         }
         
         # Get storage drives using OS-specific methods (no partition scanning)
-        if self.system == 'windows':
-            storage_info['drives'].extend(self._get_storage_info_windows())
-        elif self.system == 'linux':
-            storage_info['drives'].extend(self._get_storage_info_linux())
-        elif self.system == 'darwin':
-            storage_info['drives'].extend(self._get_storage_info_macos())
+        storage_info['drives'].extend(self._static_details('storage', []))
         
         # Calculate total capacity from drives
         total_capacity = 0
@@ -425,16 +718,8 @@ class HardwareDetector:
         """Get Windows-specific storage information."""
         drives = []
         try:
-            cmd = '''
-            Get-WmiObject -Class Win32_DiskDrive | 
-            Select-Object Model, Size, MediaType, InterfaceType | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_DiskDrive')
+            if data:
                 if not isinstance(data, list):
                     data = [data]
                 
@@ -456,7 +741,7 @@ class HardwareDetector:
         drives = []
         try:
             result = subprocess.run(['lsblk', '-d', '-o', 'NAME,SIZE,MODEL,TRAN'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 lines = result.stdout.strip().split('\n')[1:]
                 for line in lines:
@@ -478,7 +763,7 @@ class HardwareDetector:
         drives = []
         try:
             result = subprocess.run(['system_profiler', 'SPStorageDataType'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 lines = result.stdout.split('\n')
                 current_drive = {}
@@ -552,12 +837,7 @@ class HardwareDetector:
             except Exception:
                 pass
         
-        if self.system == 'windows':
-            graphics_info['gpus'].extend(self._get_graphics_info_windows())
-        elif self.system == 'linux':
-            graphics_info['gpus'].extend(self._get_graphics_info_linux())
-        elif self.system == 'darwin':
-            graphics_info['gpus'].extend(self._get_graphics_info_macos())
+        graphics_info['gpus'].extend(self._static_details('graphics', []))
         
         return graphics_info
     
@@ -565,16 +845,8 @@ class HardwareDetector:
         """Get Windows-specific graphics information."""
         gpus = []
         try:
-            cmd = '''
-            Get-WmiObject -Class Win32_VideoController | 
-            Select-Object Name, AdapterRAM, DriverVersion, VideoProcessor | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_VideoController')
+            if data:
                 if not isinstance(data, list):
                     data = [data]
                 
@@ -595,7 +867,7 @@ class HardwareDetector:
         """Get Linux-specific graphics information."""
         gpus = []
         try:
-            result = subprocess.run(['lspci'], capture_output=True, text=True)
+            result = subprocess.run(['lspci'], capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 for line in result.stdout.split('\n'):
                     if 'VGA compatible controller' in line or 'Display controller' in line:
@@ -614,7 +886,7 @@ class HardwareDetector:
         gpus = []
         try:
             result = subprocess.run(['system_profiler', 'SPDisplaysDataType'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 lines = result.stdout.split('\n')
                 current_gpu = {}
@@ -641,12 +913,7 @@ class HardwareDetector:
         """Get motherboard and BIOS information."""
         motherboard_info = {}
         
-        if self.system == 'windows':
-            motherboard_info.update(self._get_motherboard_info_windows())
-        elif self.system == 'linux':
-            motherboard_info.update(self._get_motherboard_info_linux())
-        elif self.system == 'darwin':
-            motherboard_info.update(self._get_motherboard_info_macos())
+        motherboard_info.update(self._static_details('motherboard', {}))
         
         return motherboard_info
     
@@ -654,16 +921,8 @@ class HardwareDetector:
         """Get Windows motherboard information."""
         mb_info = {}
         try:
-            cmd_mb = '''
-            Get-WmiObject -Class Win32_BaseBoard | 
-            Select-Object Manufacturer, Product, Version, SerialNumber | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd_mb], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_BaseBoard')
+            if data:
                 mb_info = {
                     'manufacturer': data.get('Manufacturer', 'Unknown'),
                     'model': data.get('Product', 'Unknown'),
@@ -671,16 +930,8 @@ class HardwareDetector:
                     'serial_number': data.get('SerialNumber', 'Unknown')
                 }
             
-            cmd_bios = '''
-            Get-WmiObject -Class Win32_BIOS | 
-            Select-Object Manufacturer, SMBIOSBIOSVersion, ReleaseDate | 
-            ConvertTo-Json
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd_bios], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
+            data = self._query_cim('Win32_BIOS')
+            if data:
                 mb_info['bios'] = {
                     'manufacturer': data.get('Manufacturer', 'Unknown'),
                     'version': data.get('SMBIOSBIOSVersion', 'Unknown'),
@@ -696,7 +947,7 @@ class HardwareDetector:
         mb_info = {}
         try:
             result = subprocess.run(['dmidecode', '-t', 'baseboard'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 for line in result.stdout.split('\n'):
                     if 'Manufacturer:' in line:
@@ -717,7 +968,7 @@ class HardwareDetector:
         mb_info = {}
         try:
             result = subprocess.run(['system_profiler', 'SPHardwareDataType'], 
-                                  capture_output=True, text=True)
+                                  capture_output=True, text=True, timeout=COLLECTOR_TIMEOUT)
             if result.returncode == 0:
                 for line in result.stdout.split('\n'):
                     if 'Model Identifier:' in line:
@@ -785,9 +1036,11 @@ class HardwareDetector:
 def check_existing_asset(mac_address, api_base_url=API_BASE_URL):
     """Check if an asset already exists in the database."""
     try:
-        response = requests.get(f"{api_base_url}/hardware/{mac_address}", headers={'Authorization': f'Bearer {API_TOKEN}'})
+        response = transport.get(f"{api_base_url}/hardware/{mac_address}", token=API_TOKEN)
         if response.status_code == 200:
-            return response.json()
+            # The asset document is wrapped as {"message": ..., "data": {...}}
+            body = response.json()
+            return body.get('data', body)
         return None
     except Exception as e:
         print(f"Error checking existing asset: {e}")
@@ -796,6 +1049,8 @@ def check_existing_asset(mac_address, api_base_url=API_BASE_URL):
 def compare_hardware_data(old_data, new_data):
     """Compare old and new hardware data to detect changes."""
     changes = []
+    # Sections missing from new_data were not collected this scan, so they are not compared
+    new_data = {**old_data, **new_data}
     
     # Compare system information
     if old_data.get('system', {}).get('hostname') != new_data.get('system', {}).get('hostname'):
@@ -875,7 +1130,7 @@ def create_hardware_alert(mac_address, changes, api_base_url=API_BASE_URL):
             'status': 'active'
         }
         
-        response = requests.post(f"{api_base_url}/alerts", json=alert_data, headers={'Authorization': f'Bearer {API_TOKEN}'})
+        response = transport.post(f"{api_base_url}/alerts", payload=alert_data, token=API_TOKEN)
         if response.status_code in [200, 201]:  # 200 OK or 201 Created
             print(f"Alert created for hardware changes: {len(changes)} changes detected")
             return True
@@ -889,7 +1144,7 @@ def create_hardware_alert(mac_address, changes, api_base_url=API_BASE_URL):
 def update_hardware_asset(mac_address, hardware_data, api_base_url=API_BASE_URL):
     """Update existing hardware asset."""
     try:
-        response = requests.put(f"{api_base_url}/hardware/{mac_address}", json=hardware_data, headers={'Authorization': f'Bearer {API_TOKEN}'})
+        response = transport.put(f"{api_base_url}/hardware/{mac_address}", payload=hardware_data, token=API_TOKEN)
         if response.status_code in [200, 201]:  # 200 OK or 201 Created
             print(f"Hardware asset updated successfully: {mac_address}")
             return True
@@ -903,7 +1158,7 @@ def update_hardware_asset(mac_address, hardware_data, api_base_url=API_BASE_URL)
 def create_hardware_asset(hardware_data, api_base_url=API_BASE_URL):
     """Create new hardware asset."""
     try:
-        response = requests.post(f"{api_base_url}/hardware", json=hardware_data, headers={'Authorization': f'Bearer {API_TOKEN}'})
+        response = transport.post(f"{api_base_url}/hardware", payload=hardware_data, token=API_TOKEN)
         if response.status_code in [200, 201]:  # 200 OK or 201 Created
             print(f"Hardware asset created successfully: {hardware_data.get('system', {}).get('mac_address')}")
             return True
@@ -919,13 +1174,106 @@ def create_hardware_asset(hardware_data, api_base_url=API_BASE_URL):
         print(f"Error creating hardware asset: {e}")
         return False
 
-def send_hardware_data(hardware_data, api_base_url=API_BASE_URL):
-    """Send hardware data with change detection and alerting."""
-    mac_address = hardware_data.get('system', {}).get('mac_address')
+def snapshot_version(data):
+    """Stable hash of a hardware document, used as its version for delta uploads."""
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _pointer_key(key):
+    """Escape a key for use in a JSON pointer."""
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+def diff_hardware_data(old, new, path=''):
+    """
+    JSON-patch style operations that turn old into new. Objects and
+    equal-length lists are compared element by element, anything else is
+    replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+        for key in old:
+            if key not in new:
+                operations.append({'op': 'remove', 'path': f"{path}/{_pointer_key(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_pointer_key(key)}"
+            if key not in old:
+                operations.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                operations.extend(diff_hardware_data(old[key], value, child))
+        return operations
     
-    if not mac_address or mac_address == "Unknown":
-        print("Error: Could not determine MAC address")
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        operations = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            operations.extend(diff_hardware_data(old_item, new_item, f"{path}/{index}"))
+        return operations
+    
+    if old == new and type(old) == type(new):
+        return []
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+def load_hardware_snapshot(mac_address, snapshot_file=HARDWARE_SNAPSHOT_FILE):
+    """Last acknowledged hardware snapshot for this MAC address, if any."""
+    if not snapshot_file:
+        return None
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable hardware snapshot: {e}")
+        return None
+    
+    if snapshot.get('mac_address') != mac_address or not snapshot.get('version'):
+        return None
+    return snapshot
+
+def save_hardware_snapshot(mac_address, data, version, snapshot_file=HARDWARE_SNAPSHOT_FILE):
+    """Record the document the server just acknowledged."""
+    if not snapshot_file:
+        return
+    
+    temp_file = f"{snapshot_file}.tmp"
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'mac_address': mac_address, 'version': version, 'data': data}, f, default=str)
+        os.replace(temp_file, snapshot_file)
+    except Exception as e:
+        print(f"Could not save hardware snapshot: {e}")
+
+def send_hardware_delta(mac_address, snapshot, data, version, api_base_url=API_BASE_URL):
+    """
+    Upload only the changes since the acknowledged snapshot. Returns False when
+    the server does not hold that snapshot, so the caller sends the full document.
+    """
+    delta = {
+        'base_version': snapshot['version'],
+        'version': version,
+        'tenant_id': data.get('tenant_id', TENANT_ID),
+        'patch': diff_hardware_data(
+            {section: snapshot['data'][section] for section in DELTA_SECTIONS if section in snapshot['data']},
+            {section: data[section] for section in DELTA_SECTIONS if section in data}
+        )
+    }
+    
+    try:
+        response = transport.patch(f"{api_base_url}/hardware/{mac_address}", payload=delta, token=API_TOKEN)
+        if response.status_code == 200:
+            print(f"Hardware delta applied for {mac_address}: {len(delta['patch'])} changes")
+            return True
+        elif response.status_code == 409:
+            print(f"Hardware snapshot out of date for {mac_address}, sending full document")
+        else:
+            print(f"Failed to apply hardware delta: {response.status_code}")
         return False
+    except Exception as e:
+        print(f"Error sending hardware delta: {e}")
+        return False
+
+def send_full_hardware_data(hardware_data, api_base_url=API_BASE_URL):
+    """Send the full hardware document with change detection against the server copy."""
+    mac_address = hardware_data.get('system', {}).get('mac_address')
     
     # Check if asset already exists
     existing_asset = check_existing_asset(mac_address, api_base_url)
@@ -950,6 +1298,49 @@ def send_hardware_data(hardware_data, api_base_url=API_BASE_URL):
         print(f"New hardware asset detected: {mac_address}")
         return create_hardware_asset(hardware_data, api_base_url)
 
+def send_hardware_data(hardware_data, api_base_url=API_BASE_URL):
+    """
+    Send hardware data with change detection and alerting. When a snapshot the
+    server acknowledged is available only a delta is uploaded; otherwise, or if
+    the server rejects the delta, the full document is sent.
+    """
+    mac_address = hardware_data.get('system', {}).get('mac_address')
+    
+    if not mac_address or mac_address == "Unknown":
+        print("Error: Could not determine MAC address")
+        return False
+    
+    data = {key: value for key, value in hardware_data.items() if key not in SNAPSHOT_EXCLUDED_KEYS}
+    # Round-trip through JSON so the snapshot and the hash see exactly what is uploaded
+    data = json.loads(json.dumps(data, default=str))
+    
+    snapshot = load_hardware_snapshot(mac_address)
+    if snapshot:
+        # Carry forward the acknowledged values of sections this scan could not collect
+        for section in DELTA_SECTIONS:
+            if section not in data and section in snapshot['data']:
+                data[section] = snapshot['data'][section]
+    version = snapshot_version(data)
+    
+    if snapshot and send_hardware_delta(mac_address, snapshot, data, version, api_base_url):
+        # The snapshot is the server copy, so compare locally instead of fetching it
+        changes = compare_hardware_data(snapshot['data'], data)
+        if changes:
+            print(f"Hardware changes detected for {mac_address}:")
+            for change in changes:
+                print(f"  - {change['description']}: {change['old_value']} -> {change['new_value']}")
+            create_hardware_alert(mac_address, changes, api_base_url)
+        
+        save_hardware_snapshot(mac_address, data, version)
+        return True
+    
+    full_data = dict(data)
+    full_data['scan_metadata'] = {'snapshot_version': version}
+    if send_full_hardware_data(full_data, api_base_url):
+        save_hardware_snapshot(mac_address, data, version)
+        return True
+    return False
+
 def main():
     """Main function - detect hardware and send to API with change detection."""
     detector = HardwareDetector()
@@ -12,7 +12,6 @@ import os
 import signal
 import logging
 from datetime import datetime
-import requests
 
 # Tenant configuration - these will be set by the download system
 TENANT_ID = os.getenv('TENANT_ID', 'default')
@@ -65,9 +64,10 @@ try:
     from hardware import HardwareDetector
     from software import SoftwareDetector
     from telemetry import send_telemetry
+    import transport
 except ImportError as e:
     print(f"Error importing scanner modules: {e}")
-    print("Make sure hardware.py, software.py, and telemetry.py are in the same directory")
+    print("Make sure hardware.py, software.py, telemetry.py and transport.py are in the same directory")
     sys.exit(1)
 
 # Configuration
@@ -138,6 +138,8 @@ class ITAMScanner:
             # Hardware scan
             logger.info("Running hardware scan...")
             hardware_data = self.hardware_detector.get_comprehensive_hardware_info()
+            scan_info = hardware_data.get('scan_info', {})
+            logger.info(f"Hardware collected in {scan_info.get('duration_seconds')}s (static cache: {scan_info.get('static_cache')})")
             hardware_result = self.send_hardware_data(hardware_data)
             
             if hardware_result['success']:
@@ -193,8 +195,7 @@ class ITAMScanner:
     def send_software_data(self, software_data):
         """Send software data to the API."""
         try:
-            headers = {'Authorization': f'Bearer {API_TOKEN}'}
-            response = requests.post(f"{API_BASE_URL}/software", json=software_data, headers=headers, timeout=30)
+            response = transport.post(f"{API_BASE_URL}/software", payload=software_data, token=API_TOKEN)
             return {
                 "success": response.status_code == 200,
                 "status_code": response.status_code,
@@ -549,10 +549,9 @@ class SoftwareDetector:
 def send_software_data(software_data, api_base_url=API_BASE_URL, api_token=API_TOKEN):
     """Send software data to the API."""
     try:
-        import requests
+        import transport
         
-        headers = {'Authorization': f'Bearer {api_token}'}
-        response = requests.post(f"{api_base_url}/software", json=software_data, headers=headers, timeout=30)
+        response = transport.post(f"{api_base_url}/software", payload=software_data, token=api_token)
         
         if response.status_code in [200, 201]:
             print(f"Software data sent successfully: {len(software_data.get('installed_software', []))} applications")
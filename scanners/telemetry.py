@@ -1,6 +1,6 @@
 import psutil
 import platform
-import requests
+import transport
 from datetime import datetime
 import uuid
 import socket
@@ -70,8 +70,7 @@ def send_telemetry(api_url):
     data = get_system_usage()
     print(data)
     try:
-        headers = {'Authorization': f'Bearer {API_TOKEN}'}
-        response = requests.post(api_url, json=data, headers=headers, timeout=10)
+        response = transport.post(api_url, payload=data, token=API_TOKEN)
         return {
             "success": True,
             "status_code": response.status_code,
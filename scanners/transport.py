@@ -0,0 +1,141 @@
+"""
+Shared HTTP transport for scanner uploads.
+All scanners send through one keep-alive requests.Session so repeated uploads
+reuse pooled connections instead of paying a TCP/TLS handshake each time.
+Large JSON bodies are gzip-compressed and failed requests are retried with
+exponential backoff and jitter.
+"""
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Timeouts in seconds, the same for every upload
+CONNECT_TIMEOUT = float(os.getenv('SCANNER_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('SCANNER_READ_TIMEOUT', '30'))
+
+# Retry policy - delays grow as BACKOFF_BASE * 2^attempt up to BACKOFF_MAX, with full jitter
+MAX_RETRIES = int(os.getenv('SCANNER_MAX_RETRIES', '3'))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+# Statuses where the server did not act on the request, safe to retry for any method
+THROTTLED_STATUSES = (429, 503)
+# Statuses where it may have, only retried for idempotent methods
+RETRY_STATUSES = (502, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'PATCH', 'DELETE')
+
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+POOL_SIZE = 4
+USER_AGENT = 'ITAM-Scanner/2.0'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The shared keep-alive session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are handled in request() so they can back off with jitter
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+        return _session
+
+
+def _encode_body(payload, headers):
+    """Serialize a JSON payload, gzip-compressing it when that is worthwhile."""
+    body = json.dumps(payload, default=str).encode('utf-8')
+    headers['Content-Type'] = 'application/json'
+    if len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return body
+
+
+def _backoff_delay(attempt, response=None):
+    """Seconds to wait before the next attempt, honouring Retry-After when given."""
+    if response is not None:
+        try:
+            return min(BACKOFF_MAX, float(response.headers.get('Retry-After', '')))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _sent_nothing(error):
+    """Whether a connection error happened before any of the request reached the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # Refused connections and DNS failures arrive as MaxRetryError(reason=NewConnectionError)
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def request(method, url, payload=None, token=None, timeout=None, retries=MAX_RETRIES):
+    """
+    Send a request through the shared session and return the response.
+    payload is sent as a JSON body. Throttling and failures to connect are
+    retried for every method; other connection errors, read timeouts and
+    gateway errors only for idempotent ones, since a POST may already have
+    been applied. The last error is raised once retries run out.
+    """
+    method = method.upper()
+    headers = {'Authorization': f"Bearer {os.getenv('API_TOKEN', '') if token is None else token}"}
+    body = _encode_body(payload, headers) if payload is not None else None
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    idempotent = method in IDEMPOTENT_METHODS
+    
+    for attempt in range(retries + 1):
+        last_attempt = attempt == retries
+        try:
+            response = get_session().request(method, url, data=body, headers=headers, timeout=timeout)
+        except requests.exceptions.ReadTimeout:
+            # A slow reply may come after the server acted on the request
+            if last_attempt or not idempotent:
+                raise
+            response = None
+        except requests.exceptions.ConnectionError as e:
+            # A connection dropped mid-request may have been acted on, like a read timeout
+            if last_attempt or not (idempotent or _sent_nothing(e)):
+                raise
+            response = None
+        else:
+            retryable = response.status_code in THROTTLED_STATUSES or (
+                idempotent and response.status_code in RETRY_STATUSES
+            )
+            if last_attempt or not retryable:
+                return response
+        
+        delay = _backoff_delay(attempt, response)
+        print(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt + 2} of {retries + 1})")
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, payload=None, **kwargs):
+    return request('POST', url, payload=payload, **kwargs)
+
+
+def put(url, payload=None, **kwargs):
+    return request('PUT', url, payload=payload, **kwargs)
+
+
+def patch(url, payload=None, **kwargs):
+    return request('PATCH', url, payload=payload, **kwargs)
@@ -328,6 +328,107 @@ export const getById = async (req, res) => {
   }
 };
 
+// Merge a scanner document into an existing asset, keeping warranty and manual entry data
+const updateFromScanner = async (existingHardware, hardwareData, query, req) => {
+  // Determine tenant_id: prioritize scanner data, then existing data, then user context, then default
+  const tenantId =
+    hardwareData.tenant_id ||
+    existingHardware.tenant_id ||
+    req.user?.tenant_id ||
+    "default";
+
+  // Update existing asset with scanner data while preserving warranty information
+  let updatedData = {
+    ...hardwareData,
+    tenant_id: tenantId, // Ensure tenant_id is preserved/updated
+    scan_metadata: {
+      ...hardwareData.scan_metadata,
+      scan_status: "completed",
+      last_scan: new Date(),
+      scanner_version:
+        hardwareData.scan_metadata?.scanner_version || "v1.0",
+    },
+  };
+
+  // Preserve existing component warranty information. A scanner may leave out
+  // sections it could not collect, which keep their stored values.
+  console.log("Scanner update: Preserving existing warranty information for asset", existingHardware._id);
+  if (existingHardware.cpu?.component_info && updatedData.cpu) {
+    console.log("Preserving CPU warranty info:", existingHardware.cpu.component_info);
+    updatedData.cpu = {
+      ...updatedData.cpu,
+      component_info: existingHardware.cpu.component_info
+    };
+  }
+  
+  if (existingHardware.memory?.slots && updatedData.memory?.slots) {
+    console.log("Preserving memory warranty info for", existingHardware.memory.slots.length, "slots");
+    updatedData.memory = {
+      ...updatedData.memory,
+      slots: updatedData.memory.slots.map((slot, index) => ({
+        ...slot,
+        component_info: existingHardware.memory.slots[index]?.component_info || slot.component_info
+      }))
+    };
+  }
+  
+  if (existingHardware.storage?.drives && updatedData.storage?.drives) {
+    console.log("Preserving storage warranty info for", existingHardware.storage.drives.length, "drives");
+    updatedData.storage = {
+      ...updatedData.storage,
+      drives: updatedData.storage.drives.map((drive, index) => ({
+        ...drive,
+        component_info: existingHardware.storage.drives[index]?.component_info || drive.component_info
+      }))
+    };
+  }
+  
+  if (existingHardware.graphics?.gpus && updatedData.graphics?.gpus) {
+    console.log("Preserving graphics warranty info for", existingHardware.graphics.gpus.length, "GPUs");
+    updatedData.graphics = {
+      ...updatedData.graphics,
+      gpus: updatedData.graphics.gpus.map((gpu, index) => ({
+        ...gpu,
+        component_info: existingHardware.graphics.gpus[index]?.component_info || gpu.component_info
+      }))
+    };
+  }
+
+  // If it's a manual entry, preserve manual entry specific fields
+  if (existingHardware.asset_info?.entry_type === "manual") {
+    updatedData.asset_info = {
+      ...hardwareData.asset_info,
+      // Preserve manual entry specific fields
+      entry_type: "manual",
+      category: existingHardware.asset_info.category,
+      model: existingHardware.asset_info.model,
+      created_manually_at: existingHardware.asset_info.created_manually_at,
+      created_manually_by: existingHardware.asset_info.created_manually_by,
+      // Update other fields from manual entry if they exist
+      vendor:
+        existingHardware.asset_info.vendor !== "Unknown"
+          ? existingHardware.asset_info.vendor
+          : hardwareData.asset_info?.vendor,
+      purchase_date:
+        existingHardware.asset_info.purchase_date ||
+        hardwareData.asset_info?.purchase_date,
+      warranty_expiry:
+        existingHardware.asset_info.warranty_expiry ||
+        hardwareData.asset_info?.warranty_expiry,
+      status: "Scanned - Data Updated",
+    };
+  } else {
+    // For scanner entries, just update the data
+    updatedData.asset_info = {
+      ...hardwareData.asset_info,
+      entry_type: "scanner",
+      status: "Scanned - Data Updated",
+    };
+  }
+
+  return Hardware.findOneAndUpdate(query, updatedData, { new: true });
+};
+
 export const createHardware = async (req, res) => {
   try {
     const hardwareData = req.body;
@@ -356,105 +457,11 @@ export const createHardware = async (req, res) => {
     const existingHardware = await Hardware.findOne(query);
 
     if (existingHardware) {
-      // Determine tenant_id: prioritize scanner data, then existing data, then user context, then default
-      const tenantId =
-        hardwareData.tenant_id ||
-        existingHardware.tenant_id ||
-        req.user?.tenant_id ||
-        "default";
-
-      // Update existing asset with scanner data while preserving warranty information
-      let updatedData = {
-        ...hardwareData,
-        tenant_id: tenantId, // Ensure tenant_id is preserved/updated
-        scan_metadata: {
-          ...hardwareData.scan_metadata,
-          scan_status: "completed",
-          last_scan: new Date(),
-          scanner_version:
-            hardwareData.scan_metadata?.scanner_version || "v1.0",
-        },
-      };
-
-      // Preserve existing component warranty information
-      console.log("Scanner update: Preserving existing warranty information for asset", macAddressString);
-      if (existingHardware.cpu?.component_info) {
-        console.log("Preserving CPU warranty info:", existingHardware.cpu.component_info);
-        updatedData.cpu = {
-          ...updatedData.cpu,
-          component_info: existingHardware.cpu.component_info
-        };
-      }
-      
-      if (existingHardware.memory?.slots) {
-        console.log("Preserving memory warranty info for", existingHardware.memory.slots.length, "slots");
-        updatedData.memory = {
-          ...updatedData.memory,
-          slots: updatedData.memory.slots.map((slot, index) => ({
-            ...slot,
-            component_info: existingHardware.memory.slots[index]?.component_info || slot.component_info
-          }))
-        };
-      }
-      
-      if (existingHardware.storage?.drives) {
-        console.log("Preserving storage warranty info for", existingHardware.storage.drives.length, "drives");
-        updatedData.storage = {
-          ...updatedData.storage,
-          drives: updatedData.storage.drives.map((drive, index) => ({
-            ...drive,
-            component_info: existingHardware.storage.drives[index]?.component_info || drive.component_info
-          }))
-        };
-      }
-      
-      if (existingHardware.graphics?.gpus) {
-        console.log("Preserving graphics warranty info for", existingHardware.graphics.gpus.length, "GPUs");
-        updatedData.graphics = {
-          ...updatedData.graphics,
-          gpus: updatedData.graphics.gpus.map((gpu, index) => ({
-            ...gpu,
-            component_info: existingHardware.graphics.gpus[index]?.component_info || gpu.component_info
-          }))
-        };
-      }
-
-      // If it's a manual entry, preserve manual entry specific fields
-      if (existingHardware.asset_info?.entry_type === "manual") {
-        updatedData.asset_info = {
-          ...hardwareData.asset_info,
-          // Preserve manual entry specific fields
-          entry_type: "manual",
-          category: existingHardware.asset_info.category,
-          model: existingHardware.asset_info.model,
-          created_manually_at: existingHardware.asset_info.created_manually_at,
-          created_manually_by: existingHardware.asset_info.created_manually_by,
-          // Update other fields from manual entry if they exist
-          vendor:
-            existingHardware.asset_info.vendor !== "Unknown"
-              ? existingHardware.asset_info.vendor
-              : hardwareData.asset_info?.vendor,
-          purchase_date:
-            existingHardware.asset_info.purchase_date ||
-            hardwareData.asset_info?.purchase_date,
-          warranty_expiry:
-            existingHardware.asset_info.warranty_expiry ||
-            hardwareData.asset_info?.warranty_expiry,
-          status: "Scanned - Data Updated",
-        };
-      } else {
-        // For scanner entries, just update the data
-        updatedData.asset_info = {
-          ...hardwareData.asset_info,
-          entry_type: "scanner",
-          status: "Scanned - Data Updated",
-        };
-      }
-
-      const updatedHardware = await Hardware.findOneAndUpdate(
+      const updatedHardware = await updateFromScanner(
+        existingHardware,
+        hardwareData,
         query,
-        updatedData,
-        { new: true }
+        req
       );
 
       return res.status(200).json({
@@ -509,6 +516,179 @@ export const createHardware = async (req, res) => {
   }
 };
 
+// Top-level sections a scanner delta may touch
+const PATCHABLE_SECTIONS = [
+  "system",
+  "cpu",
+  "memory",
+  "storage",
+  "network",
+  "graphics",
+  "motherboard",
+  "power_thermal",
+];
+
+// Keys that would reach the prototype chain instead of the document
+const FORBIDDEN_KEYS = ["__proto__", "constructor", "prototype"];
+
+const patchError = (message) => {
+  const error = new Error(message);
+  error.status = 400;
+  return error;
+};
+
+// Split a JSON pointer ("/memory/slots/0/speed") into unescaped keys
+const parsePointer = (path) => {
+  if (typeof path !== "string" || !path.startsWith("/")) {
+    throw patchError(`Invalid patch path: ${path}`);
+  }
+  const keys = path
+    .split("/")
+    .slice(1)
+    .map((key) => key.replace(/~1/g, "/").replace(/~0/g, "~"));
+
+  if (!PATCHABLE_SECTIONS.includes(keys[0])) {
+    throw patchError(`Patch path outside the hardware sections: ${path}`);
+  }
+  if (keys.some((key) => FORBIDDEN_KEYS.includes(key))) {
+    throw patchError(`Forbidden key in patch path: ${path}`);
+  }
+  return keys;
+};
+
+// Array index for a pointer key, bounded by the array length (inclusive when appending)
+const arrayIndex = (array, key, allowEnd = false) => {
+  const index = /^(0|[1-9][0-9]*)$/.test(key) ? Number(key) : NaN;
+  const limit = allowEnd ? array.length : array.length - 1;
+  if (Number.isNaN(index) || index > limit) {
+    throw patchError(`Invalid array index: ${key}`);
+  }
+  return index;
+};
+
+// Apply JSON-patch style add/replace/remove operations in place.
+// Missing parents are created, since the stored document only keeps schema fields.
+const applyHardwarePatch = (doc, operations) => {
+  for (const { op, path, value } of operations) {
+    if (!["add", "replace", "remove"].includes(op)) {
+      throw patchError(`Unsupported patch operation: ${op}`);
+    }
+
+    const keys = parsePointer(path);
+    const last = keys.pop();
+    let parent = doc;
+
+    for (const key of keys) {
+      if (Array.isArray(parent)) {
+        parent = parent[arrayIndex(parent, key)];
+        continue;
+      }
+      if (
+        !Object.hasOwn(parent, key) ||
+        parent[key] === null ||
+        typeof parent[key] !== "object"
+      ) {
+        parent[key] = {};
+      }
+      parent = parent[key];
+    }
+
+    if (parent === null || typeof parent !== "object") {
+      throw patchError(`Patch path does not lead to an object: ${path}`);
+    }
+
+    if (Array.isArray(parent)) {
+      if (op === "remove") {
+        parent.splice(arrayIndex(parent, last), 1);
+      } else {
+        parent[arrayIndex(parent, last, op === "add")] = value;
+      }
+    } else if (op === "remove") {
+      if (Object.hasOwn(parent, last)) {
+        delete parent[last];
+      }
+    } else {
+      parent[last] = value;
+    }
+  }
+  return doc;
+};
+
+// Apply a scanner delta against the snapshot version the asset was last updated from
+export const patchHardware = async (req, res) => {
+  try {
+    const { id } = req.params; // MAC address
+    const { base_version, version, patch } = req.body;
+
+    if (!base_version || !version || !Array.isArray(patch)) {
+      return res.status(400).json({
+        error: "base_version, version and a patch array are required",
+      });
+    }
+
+    // Build query with tenant_id filter
+    let query = { _id: String(id) };
+    if (req.user && req.user.tenant_id) {
+      query.tenant_id = req.user.tenant_id;
+    }
+
+    const existingHardware = await Hardware.findOne(query);
+    if (!existingHardware) {
+      return res.status(404).json({ error: "Hardware not found" });
+    }
+
+    // The scanner must resend the full document if its base is not what we stored
+    const currentVersion = existingHardware.scan_metadata?.snapshot_version;
+    if (currentVersion !== base_version) {
+      return res.status(409).json({
+        error: "Snapshot version mismatch",
+        code: "SNAPSHOT_MISMATCH",
+        version: currentVersion || null,
+      });
+    }
+
+    const { _id, __v, createdAt, updatedAt, ...current } =
+      existingHardware.toObject();
+    const hardwareData = applyHardwarePatch(current, patch);
+    hardwareData.tenant_id = req.body.tenant_id || hardwareData.tenant_id;
+    hardwareData.scan_metadata = {
+      ...hardwareData.scan_metadata,
+      snapshot_version: version,
+    };
+
+    // Only apply if no other delta moved the asset past our base in the meantime
+    const updatedHardware = await updateFromScanner(
+      existingHardware,
+      hardwareData,
+      { ...query, "scan_metadata.snapshot_version": base_version },
+      req
+    );
+    if (!updatedHardware) {
+      return res.status(409).json({
+        error: "Snapshot version mismatch",
+        code: "SNAPSHOT_MISMATCH",
+        version: null,
+      });
+    }
+
+    return res.status(200).json({
+      message: "Asset updated from scanner delta successfully",
+      version,
+      operations: patch.length,
+      updated: true,
+    });
+  } catch (error) {
+    if (error.status === 400) {
+      return res.status(400).json({ error: error.message });
+    }
+    console.error("Error applying hardware delta:", error);
+    return res.status(500).json({
+      success: false,
+      error: error.message,
+    });
+  }
+};
+
 // Update asset information (purchase date, warranty, etc.)
 // General update function for asset management
 export const updateAsset = async (req, res) => {
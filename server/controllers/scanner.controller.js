@@ -169,6 +169,7 @@ export const downloadScanner = async (req, res) => {
       "telemetry.py",
       "itam_scanner.py",
       "utils.py",
+      "transport.py",
       "patch.py",
       "wi-blu.py",
       "latest_version.py",
@@ -386,7 +387,6 @@ import os
 import signal
 import logging
 from datetime import datetime
-import requests
 
 # Configuration - will be read from config.env file or environment variables
 TENANT_ID = os.getenv('TENANT_ID', 'default')
@@ -416,9 +416,10 @@ try:
     from hardware import HardwareDetector
     from software import SoftwareDetector
     from telemetry import send_telemetry
+    import transport
 except ImportError as e:
     print(f"Error importing scanner modules: {e}")
-    print("Make sure hardware.py, software.py, and telemetry.py are in the same directory")
+    print("Make sure hardware.py, software.py, telemetry.py and transport.py are in the same directory")
     sys.exit(1)
 
 # Configuration
@@ -544,8 +545,7 @@ class ITAMScanner:
     def send_software_data(self, software_data):
         """Send software data to the API."""
         try:
-            headers = {'Authorization': f'Bearer {API_TOKEN}'}
-            response = requests.post(f"{API_BASE_URL}/software", json=software_data, headers=headers, timeout=30)
+            response = transport.post(f"{API_BASE_URL}/software", json=software_data, token=API_TOKEN)
             return {
                 "success": response.status_code == 200,
                 "status_code": response.status_code,
@@ -639,7 +639,7 @@ async function buildExecutable(tempDir, tenantId) {
     try {
       // Run PyInstaller directly with onefile option
       console.log("Running PyInstaller...");
-      const pyinstallerCmd = `pyinstaller --onefile --clean --name ITAM_Scanner --add-data "hardware.py;." --add-data "software.py;." --add-data "telemetry.py;." --add-data "utils.py;." --add-data "patch.py;." --add-data "wi-blu.py;." --add-data "latest_version.py;." --add-data "compatibility_test.py;." --add-data "test_mac.py;." --add-data "generate_test_data.py;." --hidden-import schedule --hidden-import requests --hidden-import psutil --hidden-import GPUtil itam_scanner.py`;
+      const pyinstallerCmd = `pyinstaller --onefile --clean --name ITAM_Scanner --add-data "hardware.py;." --add-data "software.py;." --add-data "telemetry.py;." --add-data "utils.py;." --add-data "transport.py;." --add-data "patch.py;." --add-data "wi-blu.py;." --add-data "latest_version.py;." --add-data "compatibility_test.py;." --add-data "test_mac.py;." --add-data "generate_test_data.py;." --hidden-import schedule --hidden-import requests --hidden-import psutil --hidden-import GPUtil itam_scanner.py`;
       await execAsync(pyinstallerCmd);
 
       // Check if executable was created
@@ -1,6 +1,12 @@
 import Telemetry from "../models/telemetry.models.js";
 import Hardware from "../models/hardware.models.js";
 
+// Slightly above the ML service's --queue-timeout (10s by default), so a request
+// the service will reject from its queue is not abandoned first, while a hung
+// service still falls back to basic predictions instead of stalling ingestion
+const ML_PREDICT_TIMEOUT_MS =
+  Number(process.env.ML_PREDICT_TIMEOUT_MS) || 11000;
+
 // ML Analysis Functions
 class HealthAnalyzer {
   static calculateHealthScore(current, historical = []) {
@@ -76,13 +82,23 @@ class HealthAnalyzer {
     return anomalies;
   }
 
-  static async generatePredictions(current, historical = [], macAddress) {
-    // Call Python ML service for advanced predictions
+  static async generatePredictions(
+    current,
+    historical = [],
+    macAddress,
+    tenantId = "default"
+  ) {
+    // Call Python ML service for advanced predictions. The tenant header lets
+    // the service cap each tenant's concurrent requests; when it is saturated
+    // it answers 503 at once and we fall back to basic predictions below, as
+    // we do when it has not answered within ML_PREDICT_TIMEOUT_MS.
     try {
       const response = await fetch("http://localhost:5000/predict", {
         method: "POST",
+        signal: AbortSignal.timeout(ML_PREDICT_TIMEOUT_MS),
         headers: {
           "Content-Type": "application/json",
+          "X-Tenant-ID": String(tenantId),
         },
         body: JSON.stringify({
           mac_address: macAddress,
@@ -395,7 +411,8 @@ export const receiveTelemetry = async (req, res) => {
     const predictions = await HealthAnalyzer.generatePredictions(
       newTelemetryData,
       historical,
-      mac_address
+      mac_address,
+      telemetry.tenant_id || tenantId
     );
     const recommendations = HealthAnalyzer.generateRecommendations(
       newTelemetryData,
@@ -248,6 +248,15 @@ const HardwareSchema = new mongoose.Schema(
       battery: { type: BatterySchema },
       temperatures: { type: mongoose.Schema.Types.Mixed, default: {} },
     },
+
+    // Scanner upload metadata
+    scan_metadata: {
+      scan_status: { type: String },
+      last_scan: { type: Date },
+      scanner_version: { type: String },
+      // Version hash of the last scanner snapshot, the base for delta uploads
+      snapshot_version: { type: String },
+    },
   },
   {
     _id: false,
@@ -4,6 +4,7 @@ import {
   getAll,
   getById,
   createHardware,
+  patchHardware,
   updateAsset,
   updateAssetInfo,
   updateUserAssetInfo,
@@ -66,6 +67,9 @@ router.post("/", createHardware);
 // PUT route to update hardware data (public - for scanners)
 router.put("/:id", createHardware);
 
+// PATCH route to apply a scanner delta (public - for scanners)
+router.patch("/:id", patchHardware);
+
 // POST route to create manual asset entry (admin only)
 router.post("/manual", verifyToken, requireAdmin, createManualAsset);
 